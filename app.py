@@ -1,11 +1,19 @@
 import json
+import time
+import pandas as pd
 import streamlit as st
-from PyPDF2 import PdfReader
+import tracing
 
-# Your project modules
-from job_spy import get_jobs          # must exist in job_spy.py
-from job_detail import fetch_job_description  # must exist in job_detail.py
-from resume_analyzer import analyze_resume_match  # must exist in resume_analyzer.py
+# Your project modules. Scraping, parsing and analysis modules (jobspy,
+# openai, PyPDF2, python-docx) are imported where they are first used, so a
+# cold worker renders the page without loading them.
+from ranker import rank_jobs
+from dedupe import describe_report
+from job_corpus import get_corpus, remember_jobs, remember_analysis
+from task_pool import get_task_pool
+
+POLL_SECONDS = 0.5
+NO_DESCRIPTION = "[No description available – maybe private/login-only page.]"
 
 
 # =========================
@@ -13,16 +21,16 @@ from resume_analyzer import analyze_resume_match  # must exist in resume_analyze
 # =========================
 
 def extract_resume_text(uploaded_file) -> str:
-    """Extract plain text from a PDF uploaded via Streamlit."""
+    """
+    Extract plain text from a resume uploaded via Streamlit.
+
+    Uses the shared resume_reader service, which caches by file content, so
+    reruns and other sessions uploading the same file skip re-parsing.
+    """
+    from resume_reader import extract_resume_bytes
+    from prompt_compact import RESUME_CHAR_BUDGET
     try:
-        reader = PdfReader(uploaded_file)
-        pages_text = []
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                pages_text.append(text)
-        text_all = "\n".join(pages_text).strip()
-        return text_all
+        return extract_resume_bytes(uploaded_file.getvalue(), uploaded_file.name, max_chars=RESUME_CHAR_BUDGET)
     except Exception as e:
         return f"[ERROR extracting resume text: {e}]"
 
@@ -31,10 +39,13 @@ def extract_resume_text(uploaded_file) -> str:
 # HELPER: SHOW MATCH RESULT
 # =========================
 
-def show_match_result(result):
+def show_match_result(result, partial=False):
     """
     Render the OpenAI analysis nicely.
 
+    With partial=True (while streaming) only the fields that have arrived
+    so far are rendered.
+
     Expected dict format:
     {
       "match_score": int 0-100,
@@ -65,20 +76,147 @@ def show_match_result(result):
         s = min(max(score, 0), 100)  # clamp 0–100
         st.progress(s / 100.0)
 
-    st.subheader("✅ Matched Skills")
-    if matched:
-        st.write(", ".join(matched))
-    else:
-        st.write("_No clearly matched skills parsed._")
+    if not partial or "matched_skills" in result:
+        st.subheader("✅ Matched Skills")
+        if matched:
+            st.write(", ".join(matched))
+        else:
+            st.write("_No clearly matched skills parsed._")
 
-    st.subheader("⚠️ Missing or Weaker Skills")
-    if missing:
-        st.write(", ".join(missing))
-    else:
-        st.write("_No obvious missing skills identified._")
+    if not partial or "missing_skills" in result:
+        st.subheader("⚠️ Missing or Weaker Skills")
+        if missing:
+            st.write(", ".join(missing))
+        else:
+            st.write("_No obvious missing skills identified._")
 
-    st.subheader("💡 Summary & Suggestions")
-    st.write(summary or "_No summary returned._")
+    if not partial or "summary" in result:
+        st.subheader("💡 Summary & Suggestions")
+        st.write(summary or "_No summary returned._")
+
+
+# =========================
+# BACKGROUND TASKS
+# =========================
+# Slow work (scraping, fetching, LLM calls) runs in the server-wide task pool
+# instead of this session's script thread. Identical requests from several
+# sessions share one task; each session stores its task ID in session_state
+# and the script reruns every POLL_SECONDS until the task is done.
+
+_pending = []  # tasks this script run is still waiting on
+
+
+def search_jobs_task(role: str, location: str, num_results: int, task=None) -> pd.DataFrame:
+    """Page-by-page search; each page's descriptions are fetched while the next page loads."""
+    from job_spy import iter_jobs, fill_descriptions
+    pages = []
+    for page in iter_jobs(role, location, num_results):
+        task.report(done=sum(len(p) for p in pages) + len(page), total=num_results,
+                    message="Fetching descriptions…", partial=pd.concat(pages + [page]))
+        pages.append(fill_descriptions(page.copy()))
+    jobs = pd.concat(pages) if pages else pd.DataFrame()
+    remember_jobs(jobs)
+    return jobs
+
+
+def fetch_description_task(url: str, task=None) -> str:
+    from job_detail import fetch_job_description
+    desc = fetch_job_description(url)
+    if desc:
+        remember_jobs(pd.DataFrame([{"job_url": url, "description": desc}]))
+    return desc or NO_DESCRIPTION
+
+
+def stream_match_task(resume_text: str, jd_text: str, task=None) -> dict:
+    """Streamed analysis; partial results are published as they arrive."""
+    from resume_analyzer import stream_resume_match
+    result = {}
+    for result in stream_resume_match(resume_text, jd_text):
+        task.report(partial=result)
+    return result
+
+
+def analyze_matches_task(resume_text: str, job_texts: list, task=None) -> list:
+    from resume_analyzer import analyze_resume_matches
+    done = []
+    task.report(done=0, total=len(job_texts))
+    return analyze_resume_matches(
+        resume_text, job_texts,
+        on_result=lambda i, _result: done.append(i) or task.report(done=len(done)),
+    )
+
+
+def start_task(state_key: str, fn, *args, **kwargs):
+    """Submit fn (which takes a `task` keyword) to the shared pool and remember its ID under state_key."""
+    st.session_state[state_key] = get_task_pool().submit(fn, *args, pass_task=True, **kwargs)
+
+
+def await_task(state_key: str, render=None):
+    """
+    Result of the task stored under state_key once it has finished (None
+    before that, or if it failed). While it runs, render(task) shows its
+    progress and the script is scheduled to rerun.
+    """
+    task_id = st.session_state.get(state_key)
+    if task_id is None:
+        return None
+    task = get_task_pool().get(task_id)
+    if task is None:
+        st.session_state.pop(state_key)
+        st.warning("A background task expired before it was shown; please run it again.")
+        return None
+    if not task.done:
+        if render:
+            render(task)
+        else:
+            st.info(task.message or "Working…")
+        _pending.append(task_id)
+        return None
+    st.session_state.pop(state_key)
+    if task.trace is not None and task.trace.spans:
+        st.session_state["last_trace"] = (state_key, task.trace.snapshot())
+    if task.error:
+        st.error(task.error)
+        return None
+    return task.result
+
+
+def render_partial_match(task):
+    st.info("Analyzing match…")
+    if task.partial:
+        show_match_result(task.partial, partial=True)
+
+
+def render_batch_progress(task):
+    st.progress(task.fraction, text=f"Analyzed {task.done_count} of {task.total or '?'}")
+
+
+# =========================
+# DEBUG PANEL (tracing)
+# =========================
+
+def show_trace(snapshot: dict):
+    if snapshot["spans"]:
+        spans = pd.DataFrame.from_dict(snapshot["spans"], orient="index").sort_values("total_ms", ascending=False)
+        st.dataframe(spans)
+    if snapshot["counters"]:
+        st.dataframe(pd.Series(snapshot["counters"], name="value"))
+
+
+def render_debug_panel():
+    """Where this session's last background task spent its time, plus process-wide totals."""
+    with st.sidebar:
+        st.subheader("Last run")
+        last = st.session_state.get("last_trace")
+        if last is None:
+            st.caption("Run a search or an analysis to see its breakdown.")
+        else:
+            st.caption(last[0])
+            show_trace(last[1])
+        with st.expander("Process totals"):
+            show_trace(tracing.snapshot())
+            st.download_button("Download Prometheus metrics", tracing.prometheus_text(),
+                               file_name="resumesync.prom")
 
 
 # =========================
@@ -96,7 +234,14 @@ st.caption(
     "Search LinkedIn jobs or paste a LinkedIn URL, then upload your resume and get an AI-powered match report."
 )
 
-tab_search, tab_url = st.tabs(["🔎 Search LinkedIn Jobs", "🔗 Paste LinkedIn Job URL"])
+# Turning this on enables tracing for the whole server process (it stays on).
+debug = st.sidebar.checkbox("🔧 Debug: timing breakdown", value=tracing.enabled())
+if debug and not tracing.enabled():
+    tracing.enable()
+
+tab_search, tab_url, tab_corpus = st.tabs(
+    ["🔎 Search LinkedIn Jobs", "🔗 Paste LinkedIn Job URL", "📚 Past Postings"]
+)
 
 
 # -------------------------------------------------------------------
@@ -115,19 +260,24 @@ with tab_search:
     with col2:
         location = st.text_input("Location", value="United States")
 
-    num_results = st.slider("Number of jobs to fetch", 3, 10, 5)
+    num_results = st.slider("Number of jobs to fetch", 3, 50, 5)
 
     jobs_df = None
 
     if st.button("Search LinkedIn via JobSpy"):
-        with st.spinner("Searching LinkedIn…"):
-            try:
-                # IMPORTANT: positional call to avoid keyword argument error
-                jobs_df = get_jobs(role, location, num_results)
-                st.session_state["jobs_df"] = jobs_df
-            except Exception as e:
-                st.error(f"Error fetching jobs: {e}")
-                jobs_df = None
+        st.session_state.pop("jobs_df", None)
+        st.session_state.pop("ranked_df", None)
+        start_task("search_task", search_jobs_task, role, location, num_results)
+
+    def _render_search(task):
+        # Show postings as soon as their page arrives.
+        st.info(f"Loaded {task.done_count} of up to {task.total} jobs — {task.message or 'searching…'}")
+        if task.partial is not None and not task.partial.empty:
+            st.dataframe(task.partial[["title", "company", "location", "job_url"]])
+
+    found = await_task("search_task", _render_search)
+    if found is not None:
+        st.session_state["jobs_df"] = found
 
     # Reuse previous search results if they exist
     if "jobs_df" in st.session_state:
@@ -149,9 +299,7 @@ with tab_search:
         if st.button("Load Job Description for Selected Job"):
             row = jobs_df.iloc[chosen_idx]
             url = row.get("job_url", "")
-
-            st.write(f"**Selected Job:** {row.get('title')} at {row.get('company')}")
-            st.write(f"🔗 {url}")
+            st.session_state["search_job"] = (row.get("title"), row.get("company"), url)
 
             # Use description from JobSpy if present, otherwise fetch via job_detail.py
             if "description" in jobs_df.columns:
@@ -159,13 +307,21 @@ with tab_search:
             else:
                 desc = ""
 
-            if not desc:
-                with st.spinner("Fetching full job description from LinkedIn…"):
-                    desc = fetch_job_description(url) or "[No description available – maybe private/login-only page.]"
+            if desc:
+                st.session_state["search_jd_text"] = desc
+            else:
+                start_task("search_jd_task", fetch_description_task, url)
 
+        desc = await_task("search_jd_task", lambda _task: st.info("Fetching full job description from LinkedIn…"))
+        if desc is not None:
             # Save to session_state BEFORE widget so no API exception
             st.session_state["search_jd_text"] = desc
 
+        if st.session_state["search_jd_text"] and "search_job" in st.session_state:
+            title, company, url = st.session_state["search_job"]
+            st.write(f"**Selected Job:** {title} at {company}")
+            st.write(f"🔗 {url}")
+
             st.subheader("📄 Job Description")
             st.text_area(
                 "Job Description Text",
@@ -177,19 +333,58 @@ with tab_search:
     jd_text = st.session_state.get("search_jd_text", "")
 
     uploaded_resume_search = st.file_uploader(
-        "Upload your resume (PDF) for the selected job",
-        type=["pdf"],
+        "Upload your resume (PDF, DOCX or TXT) for the selected job",
+        type=["pdf", "docx", "txt"],
         key="search_resume_uploader",
     )
 
     if uploaded_resume_search and jd_text and st.button("Analyze Match (Search Tab)"):
-        with st.spinner("Extracting resume and analyzing match…"):
+        with st.spinner("Extracting resume…"):
             resume_text = extract_resume_text(uploaded_resume_search)
-            result = analyze_resume_match(resume_text, jd_text)
-        show_match_result(result)
+        start_task("search_match_task", stream_match_task, resume_text, jd_text)
     elif uploaded_resume_search and not jd_text:
         st.info("Please load a job description first (above), then analyze.")
 
+    match = await_task("search_match_task", render_partial_match)
+    if match is not None:
+        show_match_result(match)
+
+    # Rank ALL search results locally, then send only the top matches to OpenAI
+    if uploaded_resume_search and jobs_df is not None and not jobs_df.empty:
+        if st.button("Rank All Results Against My Resume"):
+            resume_text = extract_resume_text(uploaded_resume_search)
+            st.session_state["ranked_df"] = rank_jobs(resume_text, jobs_df)
+
+        ranked_df = st.session_state.get("ranked_df")
+        if ranked_df is not None and not ranked_df.empty:
+            st.subheader("🏆 Ranked Results (local match, no API calls)")
+            rank_cols = ["rank_score", "title", "company", "location", "job_url"]
+            st.dataframe(ranked_df[[c for c in rank_cols if c in ranked_df.columns]])
+
+            top_k = st.number_input(
+                "AI-analyze the top N matches",
+                min_value=1,
+                max_value=len(ranked_df),
+                value=min(3, len(ranked_df)),
+            )
+            if st.button("Analyze Top Matches"):
+                resume_text = extract_resume_text(uploaded_resume_search)
+                top = ranked_df.head(int(top_k))
+                top = top[top["description"].apply(lambda d: isinstance(d, str) and bool(d.strip()))]
+                st.session_state["top_df"] = top
+                start_task("top_task", analyze_matches_task, resume_text, top["description"].tolist())
+
+            results = await_task("top_task", render_batch_progress)
+            if results is not None:
+                top = st.session_state.pop("top_df")
+                if describe_report(results.dedupe):
+                    st.caption(describe_report(results.dedupe))
+                for (_, row), result in zip(top.iterrows(), results):
+                    if "error" not in result:
+                        remember_analysis(row.get("job_url"), result)
+                    with st.expander(f"{row.get('title')} @ {row.get('company')}", expanded=True):
+                        show_match_result(result)
+
 
 # -------------------------------------------------------------------
 # TAB 2: PASTE LINKEDIN JOB URL
@@ -207,31 +402,74 @@ with tab_url:
         if not url.strip():
             st.error("Please paste a LinkedIn job URL.")
         else:
-            with st.spinner("Fetching job description from LinkedIn…"):
-                desc = fetch_job_description(url) or "[No description available – maybe private/login-only page.]"
-
-            # Save to session_state BEFORE widget so no API exception
-            st.session_state["url_jd_text"] = desc
-
-            st.subheader("📄 Job Description")
-            st.text_area(
-                "Job Description Text",
-                height=250,
-                key="url_jd_text",
-            )
+            start_task("url_jd_task", fetch_description_task, url.strip())
+
+    desc = await_task("url_jd_task", lambda _task: st.info("Fetching job description from LinkedIn…"))
+    if desc is not None:
+        # Save to session_state BEFORE widget so no API exception
+        st.session_state["url_jd_text"] = desc
+
+    if st.session_state["url_jd_text"]:
+        st.subheader("📄 Job Description")
+        st.text_area(
+            "Job Description Text",
+            height=250,
+            key="url_jd_text",
+        )
 
     jd_text_url = st.session_state.get("url_jd_text", "")
 
     uploaded_resume_url = st.file_uploader(
-        "Upload your resume (PDF) for this job",
-        type=["pdf"],
+        "Upload your resume (PDF, DOCX or TXT) for this job",
+        type=["pdf", "docx", "txt"],
         key="url_resume_uploader",
     )
 
     if uploaded_resume_url and jd_text_url and st.button("Analyze Match (URL Tab)"):
-        with st.spinner("Extracting resume and analyzing match…"):
+        with st.spinner("Extracting resume…"):
             resume_text = extract_resume_text(uploaded_resume_url)
-            result = analyze_resume_match(resume_text, jd_text_url)
-        show_match_result(result)
+        start_task("url_match_task", stream_match_task, resume_text, jd_text_url)
     elif uploaded_resume_url and not jd_text_url:
         st.info("Please fetch a job description first, then analyze.")
+
+    match = await_task("url_match_task", render_partial_match)
+    if match is not None:
+        show_match_result(match)
+
+
+# -------------------------------------------------------------------
+# TAB 3: SEARCH PAST POSTINGS (local corpus, no scraping)
+# -------------------------------------------------------------------
+with tab_corpus:
+    st.header("📚 Search Past Postings")
+
+    corpus = get_corpus()
+    if corpus is None:
+        st.info("The local job corpus is disabled (JOB_CORPUS=0).")
+    else:
+        st.caption(f"{len(corpus)} postings stored from earlier searches.")
+        query = st.text_input("Keywords", key="corpus_query")
+        uploaded_resume_corpus = st.file_uploader(
+            "Upload your resume to re-rank the results (optional)",
+            type=["pdf", "docx", "txt"],
+            key="corpus_resume_uploader",
+        )
+
+        found = corpus.search(query, limit=500)
+        if found.empty:
+            st.write("_No stored postings match._")
+        else:
+            if uploaded_resume_corpus:
+                found = rank_jobs(extract_resume_text(uploaded_resume_corpus), found)
+            cols = ["rank_score", "title", "company", "location", "job_url"]
+            st.dataframe(found[[c for c in cols if c in found.columns]])
+
+
+if debug:
+    render_debug_panel()
+
+# Poll: while any of this session's background tasks is still running,
+# rerun the script shortly so its progress (and then its result) shows up.
+if _pending:
+    time.sleep(POLL_SECONDS)
+    st.rerun()
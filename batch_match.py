@@ -0,0 +1,359 @@
+# batch_match.py — headless matching of many resumes against many jobs, streamed to JSONL
+#
+#   python batch_match.py jobs.txt resumes/ -o results.jsonl
+#   python batch_match.py jobs.txt resumes/ -o results.jsonl --workers 16 --chunk 100
+#
+# jobs.txt has one LinkedIn job URL or one search per line ("UX Researcher | Remote";
+# the location defaults to --location). Blank lines and # comments are skipped.
+#
+# Jobs go through in chunks: a chunk's descriptions are fetched once, then every
+# resume is scored against them and each result is appended to the output as it
+# completes. Progress is checkpointed in SQLite next to the output, so rerunning
+# the same command after an interruption skips finished pairs. Jobs and resume
+# texts live in the checkpoint rather than in memory, one chunk at a time.
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import tracing
+from job_detail import MAX_WORKERS, is_transient_error
+from job_urls import linkedin_job_id
+
+CHUNK_SIZE = 50
+RESUME_TYPES = (".pdf", ".docx", ".txt")
+RESULT_FIELDS = ("match_score", "matched_skills", "missing_skills", "summary")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    job_url TEXT, title TEXT, company TEXT, location TEXT,
+    description TEXT,
+    error TEXT,
+    fetched INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    text TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS pairs (
+    resume_id TEXT NOT NULL,
+    job_key TEXT NOT NULL,
+    PRIMARY KEY (resume_id, job_key)
+) WITHOUT ROWID;
+"""
+
+
+class Checkpoint:
+    """
+    Run state in SQLite: which input lines were expanded, the jobs found (with
+    fetched descriptions), extracted resume texts, and finished resume × job pairs.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def source_done(self, source: str) -> bool:
+        row = self._conn.execute("SELECT done FROM sources WHERE source = ?", (source,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_source(self, source: str):
+        self._conn.execute("INSERT INTO sources (source, done) VALUES (?, 1)"
+                           " ON CONFLICT (source) DO UPDATE SET done = 1", (source,))
+
+    def add_jobs(self, rows: list) -> int:
+        """Insert (job_key, job_url, title, company, location) rows; returns how many were new."""
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO jobs (job_key, job_url, title, company, location) VALUES (?, ?, ?, ?, ?)", rows)
+        self._conn.execute("COMMIT")
+        return self._conn.total_changes - before
+
+    def jobs_after(self, seq: int, limit: int) -> list:
+        cur = self._conn.execute(
+            "SELECT seq, job_key, job_url, title, company, location, description, error, fetched"
+            " FROM jobs WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit))
+        cols = [c[0] for c in cur.description]
+        return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    def save_descriptions(self, results: list):
+        """(job_key, description, error, fetched) per job; fetched=0 leaves it for the next run."""
+        self._conn.execute("BEGIN")
+        self._conn.executemany("UPDATE jobs SET description = ?, error = ?, fetched = ? WHERE job_key = ?",
+                               [(desc, error, fetched, key) for key, desc, error, fetched in results])
+        self._conn.execute("COMMIT")
+
+    def resume_sha(self, resume_id: str):
+        row = self._conn.execute("SELECT sha256 FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        return row[0] if row else None
+
+    def save_resume(self, resume_id: str, sha: str, text: str, error: str = None):
+        """Store a resume's text; a changed file forgets its finished pairs so they are re-scored."""
+        self._conn.execute("BEGIN")
+        self._conn.execute("DELETE FROM pairs WHERE resume_id = ?", (resume_id,))
+        self._conn.execute("INSERT OR REPLACE INTO resumes (resume_id, sha256, text, error) VALUES (?, ?, ?, ?)",
+                           (resume_id, sha, text, error))
+        self._conn.execute("COMMIT")
+
+    def resume_text(self, resume_id: str):
+        row = self._conn.execute("SELECT text FROM resumes WHERE resume_id = ?", (resume_id,)).fetchone()
+        return row[0] if row else None
+
+    def finished(self, resume_id: str, job_keys: list) -> set:
+        """The job keys among `job_keys` already scored against this resume."""
+        if not job_keys:
+            return set()
+        marks = ",".join("?" * len(job_keys))
+        return {r[0] for r in self._conn.execute(
+            f"SELECT job_key FROM pairs WHERE resume_id = ? AND job_key IN ({marks})", [resume_id, *job_keys])}
+
+    def mark_done(self, resume_id: str, job_key: str):
+        self._conn.execute("INSERT OR IGNORE INTO pairs (resume_id, job_key) VALUES (?, ?)", (resume_id, job_key))
+
+    def close(self):
+        self._conn.close()
+
+
+def _emit(out, record: dict):
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def _parse_line(line: str, default_location: str):
+    """("url", url) or ("search", (query, location)) for one jobs-file line, or None to skip it."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.lower().startswith(("http://", "https://")):
+        return "url", line
+    query, _, location = line.partition("|")
+    return "search", (query.strip(), location.strip() or default_location)
+
+
+def _ingest(ckpt: Checkpoint, jobs_file: str, location: str, search_results: int, batch: int):
+    """
+    Expand the jobs file into checkpointed job rows, line by line (searches page
+    by page). Yields after every `batch` new rows and once at the end, so
+    callers can start on the first chunk while later searches are still pending.
+    """
+    from job_spy import iter_jobs
+    pending = 0
+    urls = []
+    with open(jobs_file, encoding="utf-8") as f:
+        for line in f:
+            parsed = _parse_line(line, location)
+            if parsed is None or ckpt.source_done(line.strip()):
+                continue
+            kind, value = parsed
+            if kind == "url":
+                urls.append(value)
+                if len(urls) >= batch:
+                    pending += ckpt.add_jobs([(linkedin_job_id(u) or u, u, "", "", "") for u in urls])
+                    for u in urls:
+                        ckpt.mark_source(u)
+                    urls = []
+            else:
+                query, where = value
+                try:
+                    for page in iter_jobs(query, where, num_results=search_results):
+                        rows = [(linkedin_job_id(r.job_url or "") or r.job_url, r.job_url,
+                                 r.title or "", r.company or "", r.location or "")
+                                for r in page[["job_url", "title", "company", "location"]].itertuples(index=False)
+                                if isinstance(r.job_url, str) and r.job_url]
+                        pending += ckpt.add_jobs(rows)
+                        if pending >= batch:
+                            pending = 0
+                            yield
+                except Exception as e:
+                    print(f"Search failed for {query!r} in {where!r}: {e}", file=sys.stderr)
+                    continue
+                ckpt.mark_source(line.strip())
+            if pending >= batch:
+                pending = 0
+                yield
+    if urls:
+        ckpt.add_jobs([(linkedin_job_id(u) or u, u, "", "", "") for u in urls])
+        for u in urls:
+            ckpt.mark_source(u)
+    yield
+
+
+def iter_job_chunks(ckpt: Checkpoint, jobs_file: str, location: str, search_results: int,
+                    chunk: int = CHUNK_SIZE):
+    """
+    Checkpointed jobs in insertion order, `chunk` rows at a time: rows left
+    from an interrupted run come first, then new ones as the jobs file is expanded.
+    """
+    sources = _ingest(ckpt, jobs_file, location, search_results, chunk)
+    exhausted = False
+    last_seq = 0
+    while True:
+        rows = ckpt.jobs_after(last_seq, chunk)
+        if len(rows) < chunk and not exhausted:
+            try:
+                next(sources)
+            except StopIteration:
+                exhausted = True
+            continue
+        if not rows:
+            return
+        yield rows
+        last_seq = rows[-1]["seq"]
+
+
+def extract_resumes(ckpt: Checkpoint, resume_dir: str, out) -> list:
+    """
+    Extract every resume in resume_dir into the checkpoint (unchanged files are
+    not re-read); returns the IDs (paths relative to resume_dir) with usable text.
+    """
+    from resume_reader import extract_resume_bytes
+    from prompt_compact import RESUME_CHAR_BUDGET
+    ids = []
+    for root, _, files in os.walk(resume_dir):
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in RESUME_TYPES:
+                continue
+            path = os.path.join(root, name)
+            resume_id = os.path.relpath(path, resume_dir)
+            with open(path, "rb") as f:
+                data = f.read()
+            sha = hashlib.sha256(data).hexdigest()
+            if ckpt.resume_sha(resume_id) != sha:
+                try:
+                    text, error = extract_resume_bytes(data, name, max_chars=RESUME_CHAR_BUDGET), None
+                    if not text.strip():
+                        text, error = None, "no text found (scanned or image-only file?)"
+                except Exception as e:
+                    text, error = None, f"{type(e).__name__}: {e}"
+                if error:
+                    _emit(out, {"resume": resume_id, "error": f"could not read resume: {error}"})
+                ckpt.save_resume(resume_id, sha, text, error)
+            if ckpt.resume_text(resume_id):
+                ids.append(resume_id)
+    return sorted(ids)
+
+
+def fetch_chunk(ckpt: Checkpoint, rows: list, out, fetch_workers: int = MAX_WORKERS):
+    """
+    Fetch descriptions for the chunk's unfetched jobs (each job once, whatever
+    the resume count). A job with no description (login wall, 404) is settled;
+    one that failed on throttling, a timeout or a 5xx stays unfetched, so the
+    next run retries it.
+    """
+    from job_detail import fetch_job_descriptions
+    from job_corpus import remember_jobs
+    todo = [r for r in rows if not r["fetched"]]
+    if not todo:
+        return
+    results = fetch_job_descriptions([r["job_url"] for r in todo], max_workers=fetch_workers)
+    saved = []
+    for row, (desc, error) in zip(todo, results):
+        desc = (desc or "").strip()
+        retry = not desc and is_transient_error(error)
+        if not desc:
+            error = error or "no description available (private or login-only page)"
+            record = {"job_url": row["job_url"], "job_key": row["job_key"], "error": error}
+            if retry:
+                record["retry"] = True  # fetched again on the next run
+            _emit(out, record)
+        row.update(description=desc, error=error or None, fetched=0 if retry else 1)
+        saved.append((row["job_key"], desc, error or None, row["fetched"]))
+    ckpt.save_descriptions(saved)
+    fetched = [r for r in todo if r["description"]]
+    if fetched:
+        import pandas as pd
+        remember_jobs(pd.DataFrame(fetched)[["title", "company", "location", "job_url", "description"]])
+
+
+def analyze_chunk(ckpt: Checkpoint, resume_id: str, rows: list, out, workers: int = None) -> int:
+    """Score one resume against the chunk's jobs it hasn't been scored against; returns results written."""
+    from resume_analyzer import analyze_resume_matches
+    rows = [r for r in rows if r["description"]]
+    done = ckpt.finished(resume_id, [r["job_key"] for r in rows])
+    todo = [r for r in rows if r["job_key"] not in done]
+    if not todo:
+        return 0
+    resume_text = ckpt.resume_text(resume_id)
+
+    def on_result(i, result):
+        row = todo[i]
+        record = {"resume": resume_id, "job_url": row["job_url"], "job_key": row["job_key"],
+                  "title": row["title"], "company": row["company"]}
+        if "error" in result:
+            # Not marked done, so a rerun retries it; its later line supersedes this one.
+            record["error"] = result["error"]
+        else:
+            record.update({k: result.get(k) for k in RESULT_FIELDS})
+        record["analyzed_at"] = round(time.time(), 3)
+        _emit(out, record)
+        if "error" not in result:
+            ckpt.mark_done(resume_id, row["job_key"])
+
+    kwargs = {"max_concurrency": workers} if workers else {}
+    analyze_resume_matches(resume_text, [r["description"] for r in todo], on_result=on_result, **kwargs)
+    return len(todo)
+
+
+def run(jobs_file: str, resume_dir: str, out_path: str, checkpoint: str = None,
+        location: str = "United States", search_results: int = 25, chunk: int = CHUNK_SIZE,
+        fetch_workers: int = MAX_WORKERS, workers: int = None):
+    """Score every resume in resume_dir against every job from jobs_file, appending JSONL to out_path."""
+    ckpt = Checkpoint(checkpoint or f"{out_path}.checkpoint.sqlite3")
+    written = 0
+    try:
+        with open(out_path, "a", encoding="utf-8") as out:
+            resumes = extract_resumes(ckpt, resume_dir, out)
+            if not resumes:
+                print(f"No readable resumes ({', '.join(RESUME_TYPES)}) in {resume_dir}.", file=sys.stderr)
+                return 0
+            print(f"{len(resumes)} resumes", file=sys.stderr)
+            for n, rows in enumerate(iter_job_chunks(ckpt, jobs_file, location, search_results, chunk), 1):
+                fetch_chunk(ckpt, rows, out, fetch_workers)
+                for resume_id in resumes:
+                    written += analyze_chunk(ckpt, resume_id, rows, out, workers)
+                print(f"chunk {n}: {len(rows)} jobs, {written} results written", file=sys.stderr)
+    finally:
+        ckpt.close()
+        tracing.flush()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a directory of resumes against a list of jobs, "
+                                                 "streaming results to JSONL.")
+    parser.add_argument("jobs_file", help="one LinkedIn job URL or search ('query | location') per line")
+    parser.add_argument("resume_dir", help="directory of .pdf/.docx/.txt resumes (searched recursively)")
+    parser.add_argument("-o", "--out", default="batch_results.jsonl")
+    parser.add_argument("--checkpoint", help="progress database (default: <out>.checkpoint.sqlite3)")
+    parser.add_argument("--location", default="United States", help="location for searches without one")
+    parser.add_argument("--search-results", type=int, default=25, help="postings per search line")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="jobs fetched and scored per round")
+    parser.add_argument("--fetch-workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--workers", type=int, help="concurrent model calls (default OPENAI_MAX_CONCURRENCY)")
+    args = parser.parse_args()
+
+    try:
+        written = run(args.jobs_file, args.resume_dir, args.out, checkpoint=args.checkpoint,
+                      location=args.location, search_results=args.search_results, chunk=args.chunk,
+                      fetch_workers=args.fetch_workers, workers=args.workers)
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run the same command again to continue where it stopped.", file=sys.stderr)
+        sys.exit(130)
+    print(f"Done: {written} results written to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+# bench_e2e.py — offline end-to-end benchmark: search, fetch, parse, extract, analyze
+#
+#   python bench_e2e.py                                   # default grid -> bench_e2e.json
+#   python bench_e2e.py --batch 10 50 --concurrency 1 4 16 --llm-latency-ms 400
+#   python bench_e2e.py --out after.json --compare before.json
+#
+# Nothing leaves the machine:
+#   - LinkedIn is an HTTP proxy stub replaying fixtures/linkedin/*.html, so jobspy
+#     and job_detail request http://www.linkedin.com/... unchanged (HTTPS is refused).
+#   - OpenAI is a local /v1/chat/completions stub with configurable latency.
+#   - --throttle-every N makes both stubs refuse every Nth description fetch or
+#     completion (LinkedIn with 999, OpenAI with 429, both with Retry-After), so
+#     the host back-off, circuit breaker and retry paths run too. Each row then
+#     reports how many requests were throttled and how many were retries.
+# Caches live in a throwaway directory and are disabled, so every call is cold.
+# Project modules read their settings at import, so they are imported only after
+# configure_offline() has set the environment.
+#
+# Stages (one item each):
+#   search         get_jobs() for one query (--search-results postings, paged)
+#   fetch          one description: guest API, canonical fallback for login walls
+#   parse          extract_job_text() on one recorded page (CPU only)
+#   extract        read_resume_text() on one generated PDF/DOCX/TXT resume
+#   analyze        analyze_resume_match() through the sync client
+#   analyze_batch  analyze_resume_matches(); latency is time to each result
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import warnings
+import platform
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "linkedin")
+GUEST_PAGES = ("guest_api_posting.html", "data_test_description_section.html", "job_details_id.html",
+               "paragraph_fallback.html", "article_only.html")
+CANONICAL_PAGE = "canonical_description_text.html"
+LOGIN_WALL = "login_wall.html"
+SEARCH_PAGE = "search_results.html"
+EMPTY_SEARCH_PAGE = "<!DOCTYPE html>\n\n<!---->"  # what LinkedIn serves past the last result
+FIRST_JOB_ID = 3900000000
+
+LINKEDIN = "http://www.linkedin.com"
+STAGES = ("search", "fetch", "parse", "extract", "analyze", "analyze_batch")
+
+_RESUME_WORDS = ("user research prototyping figma accessibility wcag design systems usability testing "
+                 "journey mapping wireframes python sql stakeholder workshop portfolio agile jira "
+                 "information architecture personas sketch react typescript analytics").split()
+
+
+# =========================
+# STUB SERVERS
+# =========================
+
+def _fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    throttle_every = 0      # refuse every Nth throttle-able request (0: never)
+    throttle_status = 429
+    throttle_body = b""
+    throttle_type = "text/html; charset=utf-8"
+    retry_after = 1
+    requests = throttled = retried = 0
+    _seen = frozenset()
+    _count_lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    @classmethod
+    def reset_counts(cls):
+        with cls._count_lock:
+            cls.requests = cls.throttled = cls.retried = 0
+            cls._seen = set()
+
+    def _throttle(self, key) -> bool:
+        """
+        Count a request for `key` (a repeat counts as a retry). Every
+        throttle_every-th one is answered with throttle_status and Retry-After
+        here; returns True when that happened.
+        """
+        cls = type(self)
+        with cls._count_lock:
+            cls.requests += 1
+            cls.retried += key in cls._seen
+            cls._seen.add(key)
+            refuse = bool(cls.throttle_every) and cls.requests % cls.throttle_every == 0
+            cls.throttled += refuse
+        if refuse:
+            self._send(cls.throttle_status, cls.throttle_body, cls.throttle_type,
+                       headers={"Retry-After": str(cls.retry_after)})
+        return refuse
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency * random.uniform(0.8, 1.2))
+
+
+class LinkedInStub(_StubHandler):
+    """
+    Proxy-style stub: request lines carry the full http://www.linkedin.com/... URL.
+    Search pages are the recorded page with job IDs shifted by `start`; a
+    `fallback_rate` share of guest API calls get the login wall, so the
+    canonical-page fallback is exercised too. Throttling (999, as LinkedIn
+    sends) applies to description fetches, not search pages.
+    """
+    fallback_rate = 0.2
+    total_jobs = 1000
+    throttle_status = 999
+    _search = _guest = _canonical = _wall = None
+
+    @classmethod
+    def load(cls):
+        cls._search = _fixture(SEARCH_PAGE).decode("utf-8")
+        cls._guest = [_fixture(name) for name in GUEST_PAGES]
+        cls._canonical = _fixture(CANONICAL_PAGE)
+        cls._wall = _fixture(LOGIN_WALL)
+
+    def do_CONNECT(self):
+        self._send(405, b"HTTPS is not stubbed")
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self._sleep()
+        if url.path.endswith("/seeMoreJobPostings/search"):
+            start = int(parse_qs(url.query).get("start", ["0"])[0])
+            if start >= self.total_jobs:
+                return self._send(200, EMPTY_SEARCH_PAGE.encode("utf-8"))
+            page = re.sub(r"3900000(\d\d\d)", lambda m: str(FIRST_JOB_ID + start + int(m.group(1))), self._search)
+            return self._send(200, page.encode("utf-8"))
+        m = re.search(r"/jobs-guest/jobs/api/jobPosting/(\d+)", url.path)
+        if m:
+            if self._throttle(url.path):
+                return
+            job_id = int(m.group(1))
+            if random.Random(job_id).random() < self.fallback_rate:
+                return self._send(200, self._wall)
+            return self._send(200, self._guest[job_id % len(self._guest)])
+        if re.search(r"/jobs/view/\d+", url.path):
+            if self._throttle(url.path):
+                return
+            return self._send(200, self._canonical)
+        self._send(404, b"")
+
+
+class OpenAIStub(_StubHandler):
+    """
+    Answers /v1/chat/completions with a valid answer for the requested schema,
+    after `latency`; throttled requests get a 429 rate-limit error.
+    """
+    throttle_body = json.dumps({"error": {"message": "Rate limit reached (bench stub)",
+                                          "type": "requests", "code": "rate_limit_exceeded"}}).encode("utf-8")
+    throttle_type = "application/json"
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.loads(raw or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            return self._send(404, b"{}", "application/json")
+        self._sleep()
+        if self._throttle(raw):
+            return
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("name", "MatchResult")
+        score = random.randint(40, 95)
+        if schema == "ResumeProfile":
+            answer = {"titles": ["Product Designer"], "years_experience": 6,
+                      "skills": ["UX Research", "Prototyping", "Accessibility"], "tools": ["Figma"],
+                      "domains": ["Healthcare"], "education": ["BFA Design"]}
+        elif schema == "SummaryResult":
+            answer = {"match_score": score, "summary": "Strong research background; limited design systems work."}
+        else:
+            answer = {"match_score": score, "matched_skills": ["UX Research", "Figma"],
+                      "missing_skills": ["Design Systems"],
+                      "summary": "Strong research background; limited design systems work."}
+        content = json.dumps(answer)
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        out = {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        }
+        self._send(200, json.dumps(out).encode("utf-8"), "application/json")
+
+
+def _serve(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure_offline(cache_dir: str, linkedin_port: int, llm_port: int, linkedin_rate: float):
+    """
+    Route the app's LinkedIn and OpenAI traffic to the stubs and make every cache
+    cold. Must run before the project modules are imported (they read env at import).
+    """
+    proxy = f"http://127.0.0.1:{linkedin_port}"
+    env = {
+        "HTTP_PROXY": proxy, "http_proxy": proxy, "HTTPS_PROXY": proxy, "https_proxy": proxy,
+        "NO_PROXY": "127.0.0.1,localhost", "no_proxy": "127.0.0.1,localhost",
+        "OPENAI_API_KEY": "bench", "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "USE_MOCK": "false",
+        "LINKEDIN_GUEST_API": f"{LINKEDIN}/jobs-guest/jobs/api/jobPosting/",
+        "LINKEDIN_RATE": str(linkedin_rate), "LINKEDIN_MAX_RATE": str(linkedin_rate),
+        "RESUMESYNC_CACHE_DIR": cache_dir, "JOB_CACHE_TTL": "0", "HTTP_VALIDATOR_CACHE_MAX_MB": "0",
+        "RESUME_DISK_CACHE": "false", "RESUME_MEMORY_CACHE_SIZE": "0", "JOB_CORPUS": "0",
+    }
+    os.environ.pop("ALL_PROXY", None)
+    os.environ.pop("all_proxy", None)
+    os.environ.update(env)
+
+    from jobspy.linkedin import LinkedIn
+    LinkedIn.base_url = LINKEDIN     # plain HTTP so it goes through the proxy stub
+    LinkedIn.delay = LinkedIn.band_delay = 0  # jobspy sleeps 3-7 s between pages
+
+
+# =========================
+# INPUTS
+# =========================
+
+def make_resume(path: str, seed: int, pages: int = 2):
+    """Write a synthetic resume as PDF, DOCX or TXT (chosen by the extension)."""
+    rng = random.Random(seed)
+    ext = os.path.splitext(path)[1]
+    if ext == ".pdf":
+        from bench_pdf import make_pdf
+        data = make_pdf(pages, seed=seed)
+    else:
+        lines = [f"Candidate {seed}", "Product Designer"]
+        lines += [" ".join(rng.choice(_RESUME_WORDS) for _ in range(12)) for _ in range(45 * pages)]
+        if ext == ".docx":
+            from docx import Document
+            doc = Document()
+            for line in lines:
+                doc.add_paragraph(line)
+            buf = io.BytesIO()
+            doc.save(buf)
+            data = buf.getvalue()
+        else:
+            data = "\n".join(lines).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class Inputs:
+    """Per-item inputs; IDs and seeds never repeat within a run, so no call is served from memory."""
+
+    def __init__(self, tmp: str):
+        self.tmp = tmp
+        self._next = 0
+        self.pages = [_fixture(name).decode("utf-8") for name in GUEST_PAGES + (CANONICAL_PAGE,)]
+        self.job_texts = None
+        self.resume_text = None
+
+    def _ids(self, n: int) -> range:
+        start, self._next = self._next, self._next + n
+        return range(start, start + n)
+
+    def job_urls(self, n: int) -> list:
+        return [f"{LINKEDIN}/jobs/view/{FIRST_JOB_ID + 100_000 + i}" for i in self._ids(n)]
+
+    def resume_paths(self, n: int) -> list:
+        paths = []
+        for i in self._ids(n):
+            path = os.path.join(self.tmp, f"resume_{i}{('.pdf', '.docx', '.txt')[i % 3]}")
+            make_resume(path, seed=i)
+            paths.append(path)
+        return paths
+
+    def jobs(self, n: int) -> list:
+        """n distinct job descriptions (recorded texts, each tagged with a unique req ID)."""
+        if self.job_texts is None:
+            from job_detail import extract_job_text
+            self.job_texts = [extract_job_text(p) for p in self.pages]
+        return [f"{self.job_texts[i % len(self.job_texts)]}\nReq ID: {i}" for i in self._ids(n)]
+
+    def resume(self) -> str:
+        if self.resume_text is None:
+            from resume_reader import read_resume_text
+            from prompt_compact import RESUME_CHAR_BUDGET
+            self.resume_text = read_resume_text(self.resume_paths(1)[0], max_chars=RESUME_CHAR_BUDGET)
+        return self.resume_text
+
+
+# =========================
+# MEASUREMENT
+# =========================
+
+def _percentile(values: list, q: float) -> float:
+    """Linear-interpolated percentile (q in 0–1) of a non-empty list."""
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def _timed(fn, item):
+    start = time.perf_counter()
+    try:
+        ok = bool(fn(item))
+    except Exception:
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def run_pool(fn, items: list, concurrency: int):
+    """Call fn on every item with `concurrency` threads; returns (latencies, errors, wall seconds)."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        timings = list(pool.map(lambda item: _timed(fn, item), items))
+    wall = time.perf_counter() - start
+    return [t for t, _ in timings], sum(1 for _, ok in timings if not ok), wall
+
+
+def run_stage(stage: str, batch: int, concurrency: int, inputs: Inputs, args):
+    if stage == "search":
+        from job_spy import get_jobs
+        queries = [f"UX Designer {i}" for i in inputs._ids(batch)]
+        return run_pool(lambda q: len(get_jobs(q, "United States", num_results=args.search_results)),
+                        queries, concurrency)
+    if stage == "fetch":
+        from job_detail import _fetch_one
+        return run_pool(lambda url: _fetch_one(url, 15)[0], inputs.job_urls(batch), concurrency)
+    if stage == "parse":
+        from job_detail import extract_job_text
+        pages = [inputs.pages[i % len(inputs.pages)] for i in range(batch)]
+        return run_pool(extract_job_text, pages, concurrency)
+    if stage == "extract":
+        from resume_reader import read_resume_text
+        from prompt_compact import RESUME_CHAR_BUDGET
+        return run_pool(lambda path: read_resume_text(path, max_chars=RESUME_CHAR_BUDGET),
+                        inputs.resume_paths(batch), concurrency)
+    if stage == "analyze":
+        from resume_analyzer import analyze_resume_match
+        resume = inputs.resume()
+        return run_pool(lambda job: "error" not in analyze_resume_match(resume, job, use_cache=False),
+                        inputs.jobs(batch), concurrency)
+    if stage == "analyze_batch":
+        from resume_analyzer import analyze_resume_matches
+        resume, jobs = inputs.resume(), inputs.jobs(batch)
+        latencies = []
+        start = time.perf_counter()
+        results = analyze_resume_matches(
+            resume, jobs, max_concurrency=concurrency, use_cache=False, dedupe_threshold=0,
+            on_result=lambda i, _: latencies.append(time.perf_counter() - start),
+        )
+        wall = time.perf_counter() - start
+        return latencies, sum(1 for r in results if "error" in r), wall
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+def stub_counts() -> dict:
+    """Requests the stubs throttled and requests that repeated an earlier one, since reset_counts()."""
+    return {"throttled": LinkedInStub.throttled + OpenAIStub.throttled,
+            "retried": LinkedInStub.retried + OpenAIStub.retried}
+
+
+def summarize(stage: str, batch: int, concurrency: int, latencies: list, errors: int, wall: float) -> dict:
+    row = {"stage": stage, "batch_size": batch, "concurrency": concurrency,
+           "items": len(latencies), "errors": errors, "wall_s": round(wall, 4),
+           "throughput_per_s": round(len(latencies) / wall, 2) if wall else None}
+    row.update(stub_counts())
+    if latencies:
+        row.update({
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+        })
+    return row
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old_path: str, results: list, threshold: float) -> int:
+    """Print p95/throughput changes against an earlier run; returns the number of regressions."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["stage"], r["batch_size"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {old_path}")
+    regressions = 0
+    for r in results:
+        before = old.get((r["stage"], r["batch_size"], r["concurrency"]))
+        if not before or "p95_ms" not in r or "p95_ms" not in before:
+            continue
+        p95 = r["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        tput = (r["throughput_per_s"] / before["throughput_per_s"] - 1) if before.get("throughput_per_s") else 0.0
+        flag = p95 > threshold
+        regressions += flag
+        print(f"{r['stage']:<14} {r['batch_size']:>5} {r['concurrency']:>4}  p95 {p95:+7.1%}  "
+              f"throughput {tput:+7.1%}{'  REGRESSION' if flag else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark with LinkedIn and OpenAI stubs.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--search-results", type=int, default=25, help="postings per search")
+    parser.add_argument("--linkedin-latency-ms", type=float, default=30)
+    parser.add_argument("--llm-latency-ms", type=float, default=250)
+    parser.add_argument("--fallback-rate", type=float, default=0.2,
+                        help="share of guest API calls answered with a login wall")
+    parser.add_argument("--linkedin-rate", type=float, default=500, help="per-host request rate limit")
+    parser.add_argument("--throttle-every", type=int, default=0,
+                        help="stubs refuse every Nth description fetch / completion (0: never)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on throttled responses")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="untimed items per stage first (imports, connection pools, clients)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_e2e.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    parser.add_argument("--fail-over", type=float, default=0.2,
+                        help="with --compare, exit 1 if any p95 grows by more than this fraction")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    LinkedInStub.load()
+    LinkedInStub.latency = args.linkedin_latency_ms / 1000
+    LinkedInStub.fallback_rate = args.fallback_rate
+    OpenAIStub.latency = args.llm_latency_ms / 1000
+    for stub in (LinkedInStub, OpenAIStub):
+        stub.throttle_every = args.throttle_every
+        stub.retry_after = args.retry_after
+    linkedin, llm = _serve(LinkedInStub), _serve(OpenAIStub)
+
+    with tempfile.TemporaryDirectory(prefix="resumesync-bench-") as tmp:
+        configure_offline(tmp, linkedin.server_address[1], llm.server_address[1], args.linkedin_rate)
+        logging.getLogger("JobSpy:LinkedIn").setLevel(logging.ERROR)
+        warnings.filterwarnings("ignore", category=FutureWarning)
+        inputs = Inputs(tmp)
+
+        results = []
+        print(f"{'stage':<14} {'batch':>5} {'conc':>4} {'items/s':>9} {'p50':>9} {'p95':>9} {'errors':>6} "
+              f"{'throttled':>9} {'retried':>7}")
+        for stage in args.stages:
+            if args.warmup:
+                run_stage(stage, args.warmup, 1, inputs, args)
+            for batch in args.batch:
+                for concurrency in args.concurrency:
+                    for stub in (LinkedInStub, OpenAIStub):
+                        stub.reset_counts()
+                    row = summarize(stage, batch, concurrency, *run_stage(stage, batch, concurrency, inputs, args))
+                    results.append(row)
+                    print(f"{stage:<14} {batch:>5} {concurrency:>4} {row['throughput_per_s'] or 0:>9.1f} "
+                          f"{row.get('p50_ms', 0):>7.1f}ms {row.get('p95_ms', 0):>7.1f}ms {row['errors']:>6} "
+                          f"{row['throttled']:>9} {row['retried']:>7}")
+
+    linkedin.shutdown()
+    llm.shutdown()
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "fail_over")}
+    report = {
+        "meta": {"commit": _git_commit(), "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "cpu_count": os.cpu_count()},
+        "config": config,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.out}")
+
+    if args.compare and compare(args.compare, results, args.fail_over):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_html.py — compare the lxml/XPath and BeautifulSoup job-page extractors
+#
+#   python bench_html.py                 # all fixtures/linkedin/*.html
+#   python bench_html.py --repeat 500
+#
+# Memory is tracemalloc's peak, i.e. Python-level allocations only (libxml2's
+# own tree is not counted for either path).
+import glob
+import time
+import argparse
+import warnings
+import tracemalloc
+
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+from job_detail import _extract_text_fast, _extract_text_from_soup
+
+warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+
+FIXTURES = "fixtures/linkedin/*.html"
+
+
+def soup_path(page: str) -> str:
+    return _extract_text_from_soup(BeautifulSoup(page, "lxml"))
+
+
+def _per_call(fn, page: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(page)
+    return (time.perf_counter() - start) / repeat
+
+
+def _peak_bytes(fn, page: str) -> int:
+    tracemalloc.start()
+    fn(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.fixtures))
+    if not paths:
+        raise SystemExit(f"No fixtures match {args.fixtures}")
+
+    mismatches = 0
+    print(f"{'fixture':<36} {'soup':>9} {'lxml':>9} {'speedup':>8} {'soup mem':>10} {'lxml mem':>10}")
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            page = f.read()
+        if soup_path(page) != _extract_text_fast(page):
+            mismatches += 1
+            print(f"MISMATCH: {path}")
+            continue
+        t_soup = _per_call(soup_path, page, args.repeat)
+        t_fast = _per_call(_extract_text_fast, page, args.repeat)
+        m_soup = _peak_bytes(soup_path, page)
+        m_fast = _peak_bytes(_extract_text_fast, page)
+        name = path.rsplit("/", 1)[-1][:36]
+        print(f"{name:<36} {t_soup * 1e6:>7.0f}µs {t_fast * 1e6:>7.0f}µs {t_soup / t_fast:>7.1f}x "
+              f"{m_soup / 1024:>8.1f}KB {m_fast / 1024:>8.1f}KB")
+
+    print(f"\n{len(paths) - mismatches}/{len(paths)} fixtures give identical output")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_pdf.py — benchmark resume PDF extraction on synthetic multi-page PDFs
+#
+#   python bench_pdf.py                  # 2, 12, 40 and 120 page PDFs
+#   python bench_pdf.py --pages 60 200   # custom sizes
+import time
+import random
+import argparse
+
+from resume_reader import _parse_pdf, PDF_WORKERS
+
+_WORDS = ("user research prototyping figma accessibility wcag design systems usability testing "
+          "journey mapping wireframes interaction visual stakeholder workshop portfolio case study "
+          "information architecture personas sketch adobe illustrator motion heuristics").split()
+
+
+def make_pdf(n_pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """Build a text-only PDF (Helvetica, one content stream per page) in memory."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for p in range(n_pages):
+        lines = [" ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+        ops = ["BT /F1 10 Tf 40 800 Td 14 TL", f"(Page {p + 1}) Tj T*"]
+        ops += [f"({line}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, n_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 12, 40, 120])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=4000, help="max_chars for the budgeted run")
+    args = parser.parse_args()
+
+    print(f"process pool size: {PDF_WORKERS} (set PDF_WORKERS; 1 means parallel falls back to sequential)")
+    print(f"{'pages':>6} {'sequential':>11} {'parallel':>10} {'budgeted':>10}  chars")
+    for n in args.pages:
+        data = make_pdf(n)
+        seq_text = _parse_pdf(data, parallel=False)
+        par_text = _parse_pdf(data, parallel=True)
+        assert seq_text == par_text, "parallel extraction changed the output"
+        seq = _time(lambda: _parse_pdf(data, parallel=False), args.repeat)
+        par = _time(lambda: _parse_pdf(data, parallel=True), args.repeat)
+        bud = _time(lambda: _parse_pdf(data, max_chars=args.budget), args.repeat)
+        print(f"{n:>6} {seq * 1000:>9.1f}ms {par * 1000:>8.1f}ms {bud * 1000:>8.1f}ms  {len(seq_text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# cache_store.py — small SQLite-backed key/value cache (TTL + LRU by size)
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.path.expanduser(os.getenv("RESUMESYNC_CACHE_DIR", "~/.cache/resumesync"))
+
+def default_cache_path(name: str = "cache.sqlite3") -> str:
+    """Location of the shared on-disk cache database."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+class SQLiteCache:
+    """
+    Persistent string cache stored in one SQLite table.
+
+    - `ttl` (seconds) expires entries on read; None keeps them forever.
+    - `max_bytes` caps the total stored size; least recently used rows go first.
+    - One connection guarded by a lock, so a single instance can be shared by
+      threads (e.g. several Streamlit sessions); WAL mode lets other processes
+      read the same file while we write.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: float = None, max_bytes: int = None):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+
+    def get(self, key: str, default=None):
+        """Return the cached value (refreshing its LRU position) or `default`."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def fetched_at(self, key: str):
+        """Timestamp the entry was stored, or None if absent."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        """Store `value` and evict least recently used rows if over `max_bytes`."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            if self.max_bytes is not None:
+                self._evict()
+
+    def _evict(self):
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed ASC"):
+            doomed.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", doomed)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Entry count, stored bytes and hit/miss counters."""
+        with self._lock:
+            count, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return self.stats()["entries"]
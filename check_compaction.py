@@ -0,0 +1,69 @@
+# check_compaction.py — make sure prompt compaction keeps the skills a job asks for
+#
+#   python check_compaction.py                 # all fixtures/linkedin/*.html
+#   python check_compaction.py --tight 0.5
+#
+# Each fixture's description (extract_job_text) is compacted at the default job
+# budget and at --tight times its own token count. Every skill skill_matcher
+# finds in the description must survive the default budget, and the skills in
+# its requirements / qualifications sections must survive the tight one too.
+# At least one fixture has to be longer than the default budget, or that first
+# check never compacts anything.
+import sys
+import glob
+import argparse
+
+from job_detail import extract_job_text
+from prompt_compact import (JOB_TOKEN_BUDGET, compact_job_text, compaction_stats, count_tokens,
+                            _clean_lines, _sections)
+from skill_matcher import find_skills
+
+FIXTURES = "fixtures/linkedin/*.html"
+REQUIRED = 0  # section priority of requirements / qualifications
+
+
+def required_skills(text: str) -> set:
+    """Skills named in the description's requirement sections."""
+    body = "\n".join("\n".join(lines) for priority, lines in _sections(_clean_lines(text, set()))
+                     if priority == REQUIRED)
+    return set(find_skills(body))
+
+
+def check(path: str, tight: float) -> tuple:
+    """(skills kept at both budgets, description longer than the default budget)."""
+    with open(path, encoding="utf-8") as f:
+        text = extract_job_text(f.read())
+    name = path.rsplit("/", 1)[-1]
+    tokens = count_tokens(text)
+    ok = True
+    for budget, wanted in ((JOB_TOKEN_BUDGET, set(find_skills(text))),
+                           (max(1, int(tokens * tight)), required_skills(text))):
+        result = compact_job_text(text, budget)
+        lost = sorted(wanted - set(find_skills(result.text)))
+        ok = ok and not lost
+        print(f"{'✓' if not lost else '✗'} {name:<36} budget {budget:>4}: {result.tokens_before:>4} -> "
+              f"{result.tokens_after:>4} tokens, {len(wanted) - len(lost)}/{len(wanted)} skills kept")
+        if lost:
+            print(f"    lost: {', '.join(lost)}")
+    return ok, tokens > JOB_TOKEN_BUDGET
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if compaction drops a job's required skills.")
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--tight", type=float, default=0.7, help="tight budget as a share of each description")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.fixtures))
+    if not paths:
+        raise SystemExit(f"No fixtures match {args.fixtures}")
+    results = [check(p, args.tight) for p in paths]
+    print(f"\ntokenizer: {compaction_stats()['tokenizer']}")
+    if not any(over for _, over in results):
+        print(f"✗ no fixture is longer than the {JOB_TOKEN_BUDGET}-token default budget")
+        sys.exit(1)
+    sys.exit(0 if all(ok for ok, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
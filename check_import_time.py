@@ -0,0 +1,131 @@
+# check_import_time.py — guard startup latency of the CLI and the Streamlit app
+#
+#   python check_import_time.py                 # main and app, default budgets
+#   python check_import_time.py main --budget-ms 150
+#   python check_import_time.py resume_analyzer
+#   python check_import_time.py app-deps        # app.py's own imports, no streamlit needed
+#
+# Each entry module is imported in a fresh interpreter under `python -X importtime`.
+# The check fails (exit 1) when an import takes longer than its budget, or when
+# it loads one of the heavy dependencies that should only load on first use.
+# "app-deps" imports every module app.py imports at startup except streamlit,
+# and fails if that loads the scraping stack (see APP_DEFERRED_MODULES).
+import os
+import re
+import ast
+import sys
+import argparse
+import subprocess
+
+# Budgets in ms. The CLI only needs its menu; the app also needs pandas to render its tables.
+BUDGETS_MS = {
+    "main": float(os.getenv("MAIN_IMPORT_BUDGET_MS", 250)),
+    "app": float(os.getenv("APP_IMPORT_BUDGET_MS", 1000)),
+}
+DEFAULT_BUDGET_MS = 250
+# Loaded only when a flow needs them (scraping, analysis, resume parsing, HTML fallback).
+DEFERRED_MODULES = ("jobspy", "openai", "PyPDF2", "docx", "bs4")
+# Framework cost the app can't avoid; not counted against its budget.
+EXCLUDED = {"app": ("streamlit",)}
+# Also kept out of the app's startup: fetching and HTML parsing load with the first search.
+APP_DEFERRED_MODULES = DEFERRED_MODULES + ("lxml", "requests")
+APP_DEPS = "app-deps"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def measure(module: str) -> dict:
+    """
+    {module name: (depth, cumulative µs)} for everything a cold `import module`
+    loads (interpreter startup modules excluded); the module itself is depth 0.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+        raise RuntimeError(f"importing {module} failed: {last}")
+    # Output is post-order: a module's imports are the lines since the previous depth-0 line.
+    subtree = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        depth, name = len(m.group(3)) // 2, m.group(4)
+        subtree.append((name, (depth, int(m.group(2)))))
+        if depth == 0:
+            if name == module:
+                return dict(subtree)
+            subtree = []
+    raise RuntimeError(f"no import timing for {module}")
+
+
+def check(module: str, budget_ms: float, top: int = 5) -> bool:
+    try:
+        times = measure(module)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return False
+
+    total_us = times.get(module, (0, 0))[1]
+    excluded = [(name, us) for name, (depth, us) in times.items()
+                if depth == 1 and name in EXCLUDED.get(module, ())]
+    counted_ms = (total_us - sum(us for _, us in excluded)) / 1000
+    loaded = sorted({name.split(".")[0] for name in times} & set(DEFERRED_MODULES))
+    ok = counted_ms <= budget_ms and not loaded
+
+    note = "".join(f", excluding {name} {us / 1000:.0f} ms" for name, us in excluded)
+    print(f"{'✓' if ok else '✗'} import {module}: {counted_ms:.0f} ms (budget {budget_ms:.0f} ms{note})")
+    if loaded:
+        print(f"    loads deferred dependencies at import: {', '.join(loaded)}")
+    heaviest = sorted(((us, name) for name, (depth, us) in times.items() if depth == 1), reverse=True)
+    for us, name in heaviest[:top]:
+        print(f"    {us / 1000:8.1f} ms  {name}")
+    return ok
+
+
+def app_imports(path: str = os.path.join(HERE, "app.py")) -> list:
+    """Modules app.py imports at module level, minus the framework (EXCLUDED["app"])."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names.append(node.module)
+    return [n for n in dict.fromkeys(names) if n.split(".")[0] not in EXCLUDED["app"]]
+
+
+def check_app_imports() -> bool:
+    """Import app.py's startup modules in a fresh interpreter; fail if any deferred dependency loads."""
+    modules = app_imports()
+    code = f"import sys, {', '.join(modules)}; print(' '.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True)
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+        print(f"✗ importing app's modules failed: {last}")
+        return False
+    loaded = sorted({name.split(".")[0] for name in proc.stdout.split()} & set(APP_DEFERRED_MODULES))
+    print(f"{'✓' if not loaded else '✗'} app startup imports ({', '.join(modules)}) "
+          f"{'load ' + ', '.join(loaded) if loaded else 'load no deferred dependencies'}")
+    return not loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if importing the entry points is too slow.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS) + [APP_DEPS])
+    parser.add_argument("--budget-ms", type=float, help="budget for every module (default: per module)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest direct imports to list")
+    args = parser.parse_args()
+
+    results = [check_app_imports() if m == APP_DEPS else
+               check(m, args.budget_ms or BUDGETS_MS.get(m, DEFAULT_BUDGET_MS), args.top)
+               for m in args.modules]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
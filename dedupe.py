@@ -0,0 +1,120 @@
+# dedupe.py — MinHash/LSH near-duplicate detection for job postings
+import os
+import zlib
+import numpy as np
+from ranker import tokenize
+
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", 0.85))  # estimated Jaccard similarity; 0 disables
+NUM_PERM = 128
+WORD_SHINGLE = 5   # descriptions: 5-word shingles
+
+# Fixed seeds so signatures are comparable across runs and processes.
+_rng = np.random.default_rng(20240917)
+_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+
+def _shingles(text: str) -> set:
+    tokens = tokenize(text)
+    if len(tokens) <= WORD_SHINGLE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + WORD_SHINGLE]) for i in range(len(tokens) - WORD_SHINGLE + 1)}
+
+
+def signature(text: str, num_perm: int = NUM_PERM):
+    """MinHash signature (uint32 array of length num_perm), or None for text with no shingles."""
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Multiply-shift universal hashing: (a*x + b) mod 2^64, keep the high 32 bits.
+    h = (x[:, None] * _A[None, :num_perm] + _B[None, :num_perm]) >> _SHIFT
+    return h.min(axis=0).astype(np.uint32)
+
+
+def _bands_for(threshold: float, num_perm: int):
+    """
+    LSH (bands, rows) whose S-curve midpoint (1/b)^(1/r) sits a little below
+    the threshold: candidates are verified against the full signature, so a
+    false positive only costs a comparison while a false negative loses a duplicate.
+    """
+    target = max(threshold - 0.1, 0.05)
+    return min(((b, num_perm // b) for b in range(1, num_perm + 1)),
+               key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - target))
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures.
+
+    add() returns the key of the first indexed item whose estimated Jaccard
+    similarity is >= threshold (or the new key itself), so items collapse onto
+    one representative per cluster. Lookups touch only the items sharing an
+    LSH band bucket, not the whole index.
+    """
+
+    def __init__(self, threshold: float = DEDUPE_THRESHOLD, num_perm: int = NUM_PERM):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = _bands_for(threshold, num_perm)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._sigs = {}
+        self._rep = {}
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def query(self, text: str) -> list:
+        """[(key, estimated similarity)] for indexed items at or above the threshold, best first."""
+        sig = signature(text, self.num_perm)
+        return [] if sig is None else self._matches(sig, self._band_keys(sig))
+
+    def _matches(self, sig, band_keys) -> list:
+        candidates = set()
+        for bucket, key in zip(self._buckets, band_keys):
+            candidates.update(bucket.get(key, ()))
+        scored = [(k, float(np.mean(self._sigs[k] == sig))) for k in candidates]
+        return sorted((m for m in scored if m[1] >= self.threshold), key=lambda m: -m[1])
+
+    def add(self, key, text: str):
+        """Index `text` under `key` and return the representative key of its cluster."""
+        sig = signature(text, self.num_perm)
+        if sig is None:
+            return key
+        band_keys = self._band_keys(sig)
+        matches = self._matches(sig, band_keys)
+        rep = self._rep[matches[0][0]] if matches else key
+        self._sigs[key] = sig
+        self._rep[key] = rep
+        for bucket, band in zip(self._buckets, band_keys):
+            bucket.setdefault(band, []).append(key)
+        return rep
+
+    def __len__(self):
+        return len(self._sigs)
+
+
+def group_texts(texts, threshold: float = DEDUPE_THRESHOLD) -> list:
+    """Position of each text's cluster representative (its first near-duplicate, or itself)."""
+    texts = list(texts)
+    if not threshold or threshold <= 0:
+        return list(range(len(texts)))
+    index = NearDuplicateIndex(threshold)
+    return [index.add(i, t if isinstance(t, str) else "") for i, t in enumerate(texts)]
+
+
+def dedupe_report(reps) -> dict:
+    """Postings, clusters and calls saved for a group_texts result."""
+    reps = list(reps)
+    clusters = len(set(reps))
+    return {"postings": len(reps), "clusters": clusters, "calls_saved": len(reps) - clusters}
+
+
+def describe_report(report: dict) -> str:
+    """One line for the user about a dedupe_report, or "" when nothing was shared."""
+    if not report or not report.get("calls_saved"):
+        return ""
+    return (f"{report['postings']} postings were {report['clusters']} distinct descriptions: "
+            f"{report['calls_saved']} near-duplicate(s) reused another posting's analysis.")
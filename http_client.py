@@ -0,0 +1,127 @@
+# http_client.py — pooled keep-alive HTTP fetching with compression and revalidation
+import os
+import json
+import threading
+from typing import NamedTuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import tracing
+from cache_store import SQLiteCache, default_cache_path
+
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))  # keep-alive connections per host; at least the fetch workers
+MAX_BODY_BYTES = int(os.getenv("HTTP_MAX_BODY_BYTES", 2_000_000))  # stop reading huge pages
+VALIDATOR_CACHE_MAX_MB = float(os.getenv("HTTP_VALIDATOR_CACHE_MAX_MB", 100))  # 0 disables revalidation
+
+# urllib3 decodes brotli only when a brotli package is installed.
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+_session = None
+_session_lock = threading.Lock()
+_validators = None
+_validators_lock = threading.Lock()
+
+
+class FetchResult(NamedTuple):
+    status_code: int
+    text: str
+    bytes_received: int     # bytes on the wire (compressed), 0 for a 304
+    revalidated: bool       # True when the text came from a 304 Not Modified
+    headers: dict
+
+
+def get_session() -> requests.Session:
+    """
+    One keep-alive session for the whole process, shared by every thread, so
+    connections outlive the short-lived pools that bulk fetches run in.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _validator_cache():
+    global _validators
+    if VALIDATOR_CACHE_MAX_MB <= 0:
+        return None
+    with _validators_lock:
+        if _validators is None:
+            try:
+                _validators = SQLiteCache(default_cache_path(), table="http_validators",
+                                          max_bytes=int(VALIDATOR_CACHE_MAX_MB * 1024 * 1024))
+            except Exception as e:
+                print(f"HTTP validator cache unavailable: {e}")
+                _validators = False
+    return _validators if _validators is not False else None
+
+
+def _read_capped(r: requests.Response, max_bytes: int) -> bytes:
+    chunks = []
+    size = 0
+    for chunk in r.iter_content(chunk_size=16 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes]
+
+
+def fetch(url: str, headers: dict = None, timeout: int = 15, allow_redirects: bool = True,
+          conditional: bool = True, max_bytes: int = MAX_BODY_BYTES, extract=None) -> FetchResult:
+    """
+    GET `url` through the shared pooled session.
+
+    Bodies are requested compressed and read at most `max_bytes` (decoded).
+    `extract` (str -> str) turns a 200 body into the text the caller keeps,
+    e.g. the job description out of a page; FetchResult.text is its result.
+    With conditional=True, a URL fetched before is revalidated with
+    If-None-Match / If-Modified-Since; a 304 returns the stored text as a 200.
+    Only validators and that (extracted) text are stored, never whole pages.
+    """
+    headers = dict(headers or {})
+    headers["Accept-Encoding"] = ACCEPT_ENCODING
+    cache = _validator_cache() if conditional else None
+    stored = None
+    if cache is not None:
+        raw = cache.get(url)
+        stored = json.loads(raw) if raw else None
+        if stored and "text" in stored:  # entries from before extract= kept whole pages
+            if stored.get("etag"):
+                headers["If-None-Match"] = stored["etag"]
+            if stored.get("last_modified"):
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+    with get_session().get(url, headers=headers, timeout=timeout,
+                           allow_redirects=allow_redirects, stream=True) as r:
+        if r.status_code == 304 and stored and "text" in stored:
+            r.content  # drain the empty body so the connection goes back to the pool
+            tracing.count("cache_hits", cache="http_304")
+            return FetchResult(200, stored["text"], 0, True, dict(r.headers))
+        body = _read_capped(r, max_bytes)
+        wire_bytes = r.raw.tell() if hasattr(r.raw, "tell") else len(body)
+        charset = r.encoding if "charset" in r.headers.get("Content-Type", "").lower() else None
+        text = body.decode(charset or "utf-8", errors="replace")
+        status, response_headers = r.status_code, dict(r.headers)
+    tracing.count("bytes_fetched", wire_bytes, host=urlparse(url).netloc)
+    if extract is not None and status == 200:
+        text = extract(text)  # after the connection is back in the pool
+    result = FetchResult(status, text, wire_bytes, False, response_headers)
+
+    etag, last_modified = result.headers.get("ETag"), result.headers.get("Last-Modified")
+    if cache is not None and result.status_code == 200 and text and (etag or last_modified):
+        cache.set(url, json.dumps({"etag": etag, "last_modified": last_modified, "text": text}))
+    return result
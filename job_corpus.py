@@ -0,0 +1,250 @@
+# job_corpus.py — persistent local corpus of scraped postings with full-text search
+#
+#   python job_corpus.py search "ux designer figma"
+#   python job_corpus.py export postings.parquet
+import os
+import json
+import time
+import argparse
+import threading
+import sqlite3
+import pandas as pd
+from cache_store import default_cache_path
+from job_urls import linkedin_job_id
+
+CORPUS_ENABLED = os.getenv("JOB_CORPUS", "1") != "0"
+
+CORE_COLS = ["title", "company", "location", "job_url", "description"]
+CATEGORICAL_COLS = ("company", "location")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    title TEXT, company TEXT, location TEXT, job_url TEXT,
+    description TEXT,
+    extra TEXT,
+    analysis TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, company, location, description,
+    content='postings', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS postings_ai AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts (rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_ad AFTER DELETE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_au AFTER UPDATE OF title, company, location, description ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+    INSERT INTO postings_fts (rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+"""
+
+
+def _str(value) -> str:
+    return value if isinstance(value, str) else ""
+
+
+def _fts_query(text: str) -> str:
+    """Free text as an FTS5 query: every word must match, punctuation (c++, node.js) is literal."""
+    return " ".join('"%s"' % w.replace('"', '""') for w in (text or "").split())
+
+
+class JobCorpus:
+    """
+    Every posting ever scraped, keyed by LinkedIn job ID, with an FTS5 index
+    over title, company, location and description.
+
+    Columns beyond get_jobs' core ones (date_posted, job_type, salary...) are
+    kept as a JSON `extra` blob. Re-adding a posting never blanks a field:
+    e.g. a re-scrape without a description keeps the fetched one.
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or default_cache_path("job_corpus.sqlite3"),
+                                     check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add_jobs(self, df: pd.DataFrame) -> int:
+        """Upsert a get_jobs-style DataFrame; returns the number of rows written."""
+        if df is None or df.empty or "job_url" not in df.columns:
+            return 0
+        extra_cols = [c for c in df.columns if c not in CORE_COLS and c != "rank_score"]
+        extras = (json.loads(df[extra_cols].to_json(orient="records", date_format="iso"))
+                  if extra_cols else [{}] * len(df))
+        now = time.time()
+        core = df.reindex(columns=CORE_COLS)
+        rows = []
+        for (title, company, location, url, desc), extra in zip(core.itertuples(index=False), extras):
+            url = _str(url)
+            if not url:
+                continue
+            rows.append((
+                linkedin_job_id(url) or url,
+                _str(title), _str(company), _str(location), url, _str(desc).strip(),
+                json.dumps({k: v for k, v in extra.items() if v not in (None, "")}),
+                now, now,
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO postings (job_key, title, company, location, job_url, description, extra,"
+                " first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (job_key) DO UPDATE SET"
+                "  title = COALESCE(NULLIF(excluded.title, ''), postings.title),"
+                "  company = COALESCE(NULLIF(excluded.company, ''), postings.company),"
+                "  location = COALESCE(NULLIF(excluded.location, ''), postings.location),"
+                "  description = COALESCE(NULLIF(excluded.description, ''), postings.description),"
+                "  extra = CASE WHEN excluded.extra != '{}' THEN excluded.extra ELSE postings.extra END,"
+                "  job_url = excluded.job_url, last_seen = excluded.last_seen",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def record_analysis(self, job_url: str, result: dict):
+        """Attach an analysis result to a stored posting (no-op for unknown URLs)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE postings SET analysis = ? WHERE job_key = ?",
+                (json.dumps(result), linkedin_job_id(job_url or "") or job_url),
+            )
+
+    def search(self, query: str = "", limit: int = 200) -> pd.DataFrame:
+        """
+        Postings matching `query` (all words, stemmed), best BM25 match first;
+        an empty query returns the most recently seen postings.
+        """
+        cols = "p.title, p.company, p.location, p.job_url, p.description, p.analysis, p.last_seen"
+        with self._lock:
+            if _fts_query(query):
+                return pd.read_sql_query(
+                    f"SELECT {cols} FROM postings_fts JOIN postings p ON p.id = postings_fts.rowid"
+                    " WHERE postings_fts MATCH ? ORDER BY bm25(postings_fts) LIMIT ?",
+                    self._conn, params=(_fts_query(query), limit),
+                )
+            return pd.read_sql_query(
+                f"SELECT {cols} FROM postings p ORDER BY p.last_seen DESC LIMIT ?",
+                self._conn, params=(limit,),
+            )
+
+    def iter_frames(self, chunk_rows: int = 5000):
+        """The whole corpus as DataFrames of at most `chunk_rows`, with categorical company/location."""
+        cols = ["job_key", "title", "company", "location", "job_url", "description",
+                "extra", "analysis", "first_seen", "last_seen"]
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, {', '.join(cols)} FROM postings WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_rows),
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            df = pd.DataFrame([r[1:] for r in rows], columns=cols)
+            for c in CATEGORICAL_COLS:
+                df[c] = df[c].astype("category")
+            for c in ("first_seen", "last_seen"):
+                df[c] = pd.to_datetime(df[c], unit="s")
+            yield df
+
+    def export_parquet(self, path, chunk_rows: int = 5000) -> int:
+        """
+        Write the corpus to Parquet one row group per chunk (needs pyarrow).
+        Company and location are dictionary-encoded. Returns the row count.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+
+        text, dict_text = pa.string(), pa.dictionary(pa.int32(), pa.string())
+        schema = pa.schema([
+            ("job_key", text), ("title", text), ("company", dict_text), ("location", dict_text),
+            ("job_url", text), ("description", text), ("extra", text), ("analysis", text),
+            ("first_seen", pa.timestamp("ns")), ("last_seen", pa.timestamp("ns")),
+        ])
+        written = 0
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for df in self.iter_frames(chunk_rows):
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+                written += len(df)
+        return written
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus():
+    """Shared corpus, created on first use (None when disabled or unavailable)."""
+    global _corpus
+    if not CORPUS_ENABLED:
+        return None
+    with _corpus_lock:
+        if _corpus is None:
+            try:
+                _corpus = JobCorpus()
+            except Exception as e:
+                print(f"Job corpus unavailable: {e}")
+                _corpus = False
+    return _corpus if _corpus is not False else None
+
+
+def remember_jobs(jobs: pd.DataFrame):
+    """Keep scraped postings in the local corpus for later offline search."""
+    corpus = get_corpus()
+    if corpus is None:
+        return
+    try:
+        corpus.add_jobs(jobs)
+    except Exception as e:
+        print(f"Could not save postings to the local corpus: {e}")
+
+
+def remember_analysis(job_url: str, result: dict):
+    corpus = get_corpus()
+    if corpus is None:
+        return
+    try:
+        corpus.record_analysis(job_url, result)
+    except Exception as e:
+        print(f"Could not save analysis to the local corpus: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search or export the local job corpus.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_search = sub.add_parser("search")
+    p_search.add_argument("query", nargs="?", default="")
+    p_search.add_argument("--limit", type=int, default=20)
+    p_export = sub.add_parser("export")
+    p_export.add_argument("path")
+    args = parser.parse_args()
+
+    corpus = JobCorpus()
+    if args.cmd == "search":
+        for _, row in corpus.search(args.query, limit=args.limit).iterrows():
+            print(f"{row['title'][:50]} — {row['company'][:30]} — {row['location'][:30]}\n  {row['job_url']}")
+    else:
+        print(f"Wrote {corpus.export_parquet(args.path)} postings to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
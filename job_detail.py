@@ -1,15 +1,93 @@
 # job_detail.py — LinkedIn public (guest) description fetcher
+import os
 import re
-import requests
-from bs4 import BeautifulSoup
-from user_agents import get_random_headers
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from lxml import etree, html as lxml_html
+import tracing
+from user_agents import get_random_headers, rotate_user_agent
+from http_client import fetch
+from rate_limit import HostThrottled, THROTTLE_STATUSES, get_host_throttle, parse_retry_after
+from cache_store import SQLiteCache, default_cache_path
+from job_urls import linkedin_job_id
 
 MAX_CHARS = 100_000  # allow long descriptions
+MAX_WORKERS = 8       # default parallel fetches for bulk lookups
+THROTTLE_RETRIES = 3  # bulk fetches retry a throttled URL after the host's back-off
+
+# Guest API base (override to point at a local stub server) and per-host pacing
+LINKEDIN_GUEST_API = os.getenv("LINKEDIN_GUEST_API", "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/")
+LINKEDIN_RATE = float(os.getenv("LINKEDIN_RATE", 2.0))          # starting requests/sec per host
+LINKEDIN_MAX_RATE = float(os.getenv("LINKEDIN_MAX_RATE", 8.0))
+
+# On-disk description cache, keyed by LinkedIn job ID (JOB_CACHE_TTL=0 disables)
+JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", 24 * 3600))
+JOB_CACHE_MAX_MB = float(os.getenv("JOB_CACHE_MAX_MB", 50))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Errors from fetch_job_descriptions worth retrying later (named by exception type):
+# throttling, a failing server, or the network. Anything else, like an empty
+# description from a login wall or a 404, will not change on a retry.
+TRANSIENT_ERRORS = ("HostThrottled", "ServerError", "Timeout", "ConnectTimeout", "ReadTimeout",
+                    "ConnectionError", "ChunkedEncodingError")
+
+class ServerError(Exception):
+    """Raised when LinkedIn answers with a 5xx (other than the 503 throttle) for a description."""
+
+def is_transient_error(error: str) -> bool:
+    """True when a fetch_job_descriptions error may succeed on a later attempt."""
+    return bool(error) and error.split(":", 1)[0] in TRANSIENT_ERRORS
+
+_SPACE_RE = re.compile(r"\s+")
+# Elements that start a new line in the extracted text (paragraphs, bullets,
+# headings, breaks), so the prompt compactor can tell sections and items apart.
+# List items also start with BULLET, so a short one ("Figma") never reads as a heading.
+BULLET = "•"
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "h1", "h2",
+    "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "ol", "p", "pre", "section", "table", "td",
+    "th", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "template"}
 
 def _clean(txt: str) -> str:
-    return re.sub(r"\s+", " ", (txt or "")).strip()
+    """Collapse whitespace within each line and drop empty lines; a lone bullet joins the next line."""
+    lines, bullet = [], False
+    for line in (txt or "").split("\n"):
+        line = _SPACE_RE.sub(" ", line).strip()
+        if line == BULLET:
+            bullet = True
+        elif line:
+            lines.append(f"{BULLET} {line}" if bullet and not line.startswith(BULLET) else line)
+            bullet = False
+    return "\n".join(lines)
 
-def _extract_text_from_soup(soup: BeautifulSoup) -> str:
+def _soup_text(node) -> str:
+    """Text of a BeautifulSoup tag: inline text joined by spaces, one line per block element."""
+    from bs4 import CData, NavigableString, Tag
+    parts = []
+
+    def walk(el):
+        for child in el.children:
+            if isinstance(child, Tag):
+                if child.name in _SKIP_TAGS:
+                    continue
+                block = child.name in _BLOCK_TAGS
+                if block:
+                    parts.append(f"\n{BULLET} " if child.name == "li" else "\n")
+                walk(child)
+                if block:
+                    parts.append("\n")
+            elif type(child) in (NavigableString, CData):  # not comments, doctypes or script text
+                parts.append(_SPACE_RE.sub(" ", child))
+
+    walk(node)
+    return _clean(" ".join(parts))
+
+def _extract_text_from_soup(soup) -> str:
     """Try common LinkedIn job description containers."""
     selectors = [
         '[data-test-description-section]',
@@ -22,51 +100,207 @@ def _extract_text_from_soup(soup: BeautifulSoup) -> str:
     for sel in selectors:
         node = soup.select_one(sel)
         if node:
-            return _clean(node.get_text(" ", strip=True))
-    paras = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+            return _soup_text(node)
+    paras = [_soup_text(p) for p in soup.find_all("p")]
+    if paras:
+        longest = max(paras, key=len)
+        if len(longest) > 100:
+            return longest
+    return ""
+
+def _class_xpath(tag: str, cls: str) -> str:
+    return f'//{tag}[contains(concat(" ", normalize-space(@class), " "), " {cls} ")]'
+
+# XPath equivalents of the CSS selectors above, in the same priority order.
+_XPATHS = [
+    etree.XPath('//*[@data-test-description-section]'),
+    etree.XPath(_class_xpath("div", "show-more-less-html__markup")),
+    etree.XPath(_class_xpath("div", "description__text")),
+    etree.XPath(_class_xpath("section", "description")),
+    etree.XPath('//div[@id="job-details"]'),
+    etree.XPath('//article'),
+]
+_PARAS = etree.XPath('//p')
+# Comments stay in the tree: removing them would merge the text on either side.
+_HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+def _node_text(node) -> str:
+    """Same text as _soup_text for an lxml element."""
+    parts = []
+
+    def walk(el):
+        # Comments and processing instructions have a non-string tag; only their tail is text.
+        if isinstance(el.tag, str) and el.tag not in _SKIP_TAGS:
+            block = el is not node and el.tag in _BLOCK_TAGS
+            if block:
+                parts.append(f"\n{BULLET} " if el.tag == "li" else "\n")
+            if el.text:
+                parts.append(_SPACE_RE.sub(" ", el.text))
+            for child in el:
+                walk(child)
+            if block:
+                parts.append("\n")
+        if el is not node and el.tail:
+            parts.append(_SPACE_RE.sub(" ", el.tail))
+
+    walk(node)
+    return _clean(" ".join(parts))
+
+def _extract_text_fast(page: str) -> str:
+    """lxml/XPath version of _extract_text_from_soup (no BeautifulSoup tree)."""
+    root = lxml_html.document_fromstring(page.encode("utf-8"), parser=_HTML_PARSER)
+    for xp in _XPATHS:
+        found = xp(root)
+        if found:
+            return _node_text(found[0])
+    paras = [_node_text(p) for p in _PARAS(root)]
     if paras:
         longest = max(paras, key=len)
         if len(longest) > 100:
-            return _clean(longest)
+            return longest
     return ""
 
-def _linkedin_job_id(url: str) -> str:
-    """Extract the numeric job ID from a LinkedIn job URL."""
-    m = re.search(r"/jobs/view/(\d+)", url)
-    if m:
-        return m.group(1)
-    m = re.search(r"/view/(\d+)", url)
-    return m.group(1) if m else ""
+def extract_job_text(page: str) -> str:
+    """Description text from a job page: fast lxml path, BeautifulSoup as the fallback."""
+    if not page:
+        return ""
+    with tracing.span("parse.job_html", chars=len(page)):
+        try:
+            return _extract_text_fast(page)
+        except Exception:
+            from bs4 import BeautifulSoup  # only needed for pages the lxml path can't read
+            tracing.count("fallbacks", path="bs4")
+            return _extract_text_from_soup(BeautifulSoup(page, "lxml"))
+
+def host_throttle(url: str):
+    """Shared adaptive limiter for the URL's host; throttling rotates that host's user agent."""
+    return get_host_throttle(urlparse(url).netloc, rate=LINKEDIN_RATE,
+                             max_rate=LINKEDIN_MAX_RATE, on_throttle=rotate_user_agent)
+
+def _throttled_get(url: str, timeout: int, referer: str = None):
+    """
+    GET through the host's limiter; raises HostThrottled on 429/999/503 or an
+    open circuit, ServerError on other 5xx. A 200's text is the extracted
+    description, not the page.
+    """
+    throttle = host_throttle(url)
+    throttle.acquire()
+    headers = get_random_headers(no_cache=False, host=throttle.host)
+    if referer:
+        headers["Referer"] = referer
+    r = fetch(url, headers=headers, timeout=timeout, allow_redirects=True, extract=extract_job_text)
+    throttle.record(r.status_code, parse_retry_after(r.headers.get("Retry-After")))
+    if r.status_code in THROTTLE_STATUSES:
+        raise HostThrottled(f"{throttle.host} returned HTTP {r.status_code}")
+    if r.status_code >= 500:
+        raise ServerError(f"{throttle.host} returned HTTP {r.status_code}")
+    return r
 
 def _fetch_linkedin_guest(url: str, timeout: int = 15) -> str:
     """Fetch job description from LinkedIn's public guest API."""
-    job_id = _linkedin_job_id(url)
+    job_id = linkedin_job_id(url)
     if not job_id:
         return ""
-    api_url = f"https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
-    r = requests.get(api_url, headers=get_random_headers(), timeout=timeout)
-    if r.status_code != 200 or not r.text:
+    with tracing.span("fetch.guest"):
+        r = _throttled_get(f"{LINKEDIN_GUEST_API}{job_id}", timeout)
+    if r.status_code != 200:
         return ""
-    soup = BeautifulSoup(r.text, "lxml")
-    txt = _extract_text_from_soup(soup)
-    return txt[:MAX_CHARS] if txt else ""
+    return r.text[:MAX_CHARS]
 
 def _fetch_linkedin_canonical(url: str, timeout: int = 15) -> str:
     """Fallback: fetch the actual job posting page HTML."""
-    headers = get_random_headers()
-    headers["Referer"] = "https://www.google.com/"
-    r = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-    if r.status_code != 200 or not r.text:
+    tracing.count("fallbacks", path="canonical")
+    with tracing.span("fetch.canonical"):
+        r = _throttled_get(url, timeout, referer="https://www.google.com/")
+    if r.status_code != 200:
         return ""
-    soup = BeautifulSoup(r.text, "lxml")
-    txt = _extract_text_from_soup(soup)
-    return txt[:MAX_CHARS] if txt else ""
+    return r.text[:MAX_CHARS]
+
+def get_description_cache():
+    """Shared description cache, created on first use (None when disabled)."""
+    global _cache
+    if JOB_CACHE_TTL <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = SQLiteCache(
+                    default_cache_path(),
+                    table="job_descriptions",
+                    ttl=JOB_CACHE_TTL,
+                    max_bytes=int(JOB_CACHE_MAX_MB * 1024 * 1024),
+                )
+            except Exception as e:
+                print(f"Job description cache unavailable: {e}")
+                _cache = False
+    return _cache if _cache is not False else None
+
+def fetch_job_description(url: str, timeout: int = 15, use_cache: bool = True,
+                          raise_throttled: bool = False) -> str:
+    """
+    Main entry: cached copy if fresh, else guest API, then canonical HTML fallback.
 
-def fetch_job_description(url: str, timeout: int = 15) -> str:
-    """Main entry: try guest API, then canonical HTML fallback."""
+    The fallback is skipped while the host is throttling us. A throttled fetch
+    or a server error returns "" (or raises HostThrottled / ServerError with
+    raise_throttled=True), so callers can tell it from a page with no description.
+    """
     if not url or "linkedin.com" not in url.lower():
         return ""
-    txt = _fetch_linkedin_guest(url, timeout=timeout)
-    if txt:
+    with tracing.span("fetch") as span:
+        job_id = linkedin_job_id(url)
+        cache = get_description_cache() if use_cache and job_id else None
+        if cache is not None:
+            cached = cache.get(job_id)
+            if cached is not None:
+                tracing.count("cache_hits", cache="description")
+                span.set(source="cache")
+                return cached
+            tracing.count("cache_misses", cache="description")
+        try:
+            txt = _fetch_linkedin_guest(url, timeout=timeout)
+            span.set(source="guest")
+            if not txt and host_throttle(url).allow_fallback():
+                txt = _fetch_linkedin_canonical(url, timeout=timeout)
+                span.set(source="canonical")
+        except HostThrottled:
+            tracing.count("throttled", host=urlparse(url).netloc)
+            span.set(source="throttled")
+            if raise_throttled:
+                raise
+            return ""
+        except ServerError:
+            span.set(source="server_error")
+            if raise_throttled:
+                raise
+            return ""
+        if txt and cache is not None:
+            cache.set(job_id, txt)
         return txt
-    return _fetch_linkedin_canonical(url, timeout=timeout)
\ No newline at end of file
+
+def _fetch_one(url: str, timeout: int) -> tuple:
+    """Fetch a single description, capturing any error instead of raising."""
+    for attempt in range(THROTTLE_RETRIES + 1):
+        try:
+            return fetch_job_description(url, timeout=timeout, raise_throttled=True), ""
+        except HostThrottled as e:
+            # The limiter waits out a Retry-After up to its max_wait; past that (or
+            # with the circuit open) acquire() would only raise again at once.
+            throttle = host_throttle(url)
+            if attempt == THROTTLE_RETRIES or throttle.wait_time > throttle.max_wait:
+                return "", f"{type(e).__name__}: {e}"
+        except Exception as e:
+            return "", f"{type(e).__name__}: {e}"
+
+def fetch_job_descriptions(urls, max_workers: int = MAX_WORKERS, timeout: int = 15) -> list:
+    """
+    Fetch many job descriptions concurrently through a bounded thread pool.
+
+    Returns a list of (description, error) tuples in the same order as `urls`.
+    `error` is "" on success; a failed URL never aborts the rest of the batch.
+    """
+    urls = [u or "" for u in urls]
+    if not urls:
+        return []
+    workers = max(1, min(max_workers, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(tracing.bind(lambda u: _fetch_one(u, timeout)), urls))
@@ -1,23 +1,155 @@
 # job_spy.py — LinkedIn search via python-jobspy
-from jobspy import scrape_jobs
+import queue
+import threading
 import pandas as pd
+import tracing
+from job_detail import fetch_job_descriptions, host_throttle, MAX_WORKERS
+
+PAGE_SIZE = 10  # LinkedIn serves search results in pages of 10
+# Search pages share the LinkedIn host limiter with description fetches.
+SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
+NEED_COLS = ["title", "company", "location", "job_url", "description"]
+
+def _order_columns(df: pd.DataFrame) -> pd.DataFrame:
+    for c in NEED_COLS:
+        if c not in df.columns:
+            df[c] = ""
+    return df[NEED_COLS + [c for c in df.columns if c not in NEED_COLS]]
+
+def fill_descriptions(df: pd.DataFrame, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Fetch missing descriptions for every row with a blank `description` cell.
+
+    Every posting gets its own description: similar postings (e.g. "Designer II"
+    and "Designer III" at one company) are different jobs, so near-duplicates
+    are only collapsed later, on the fetched text, by analyze_resume_matches.
+    Rows repeating the same URL are fetched once.
+    """
+    blank = df["description"].fillna("").astype(str).str.strip() == ""
+    if not blank.any():
+        return df
+    if "description_error" not in df.columns:
+        df["description_error"] = ""
+    urls = df.loc[blank, "job_url"].fillna("").astype(str)
+    unique = list(dict.fromkeys(urls))
+    if len(unique) < len(urls):
+        tracing.count("dedupe_skipped", len(urls) - len(unique), stage="fetch")
+    fetched = dict(zip(unique, fetch_job_descriptions(unique, max_workers=max_workers)))
+    df.loc[blank, "description"] = [fetched[u][0] for u in urls]
+    df.loc[blank, "description_error"] = [fetched[u][1] for u in urls]
+    return df
 
 def get_jobs(search_term: str,
              location: str,
-             num_results: int = 5) -> pd.DataFrame:
-    """Fetch LinkedIn jobs with python-jobspy."""
-    df = scrape_jobs(
-        site_name="linkedin",
-        search_term=search_term,
-        location=location,
-        results_wanted=num_results,
-        get_skills=False,
+             num_results: int = 5,
+             fetch_descriptions: bool = False,
+             max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Fetch LinkedIn jobs with python-jobspy.
+
+    With fetch_descriptions=True, blank `description` cells are filled by
+    fetching every posting concurrently (see job_detail.fetch_job_descriptions).
+    """
+    from jobspy import scrape_jobs  # heavy (~1s); loaded only when a search runs
+    with tracing.span("search.scrape_jobs", results_wanted=num_results):
+        df = scrape_jobs(
+            site_name="linkedin",
+            search_term=search_term,
+            location=location,
+            results_wanted=num_results,
+            get_skills=False,
+        )
+    df = _order_columns(df)
+    if fetch_descriptions and not df.empty:
+        df = fill_descriptions(df.copy(), max_workers=max_workers)
+    return df
+
+def _scrape_pages(search_term, location, num_results, page_size, out: queue.Queue, stop: threading.Event):
+    """
+    Producer thread: scrape page after page into `out`, ending with None (or an
+    exception). Each page is one scrape_jobs call, so jobspy's delay between
+    pages never applies; the LinkedIn host limiter paces them instead.
+    """
+    try:
+        from jobspy import scrape_jobs
+        throttle = host_throttle(SEARCH_URL)
+        offset = 0
+        while offset < num_results and not stop.is_set():
+            want = min(page_size, num_results - offset)
+            throttle.acquire()
+            with tracing.span("search.scrape_jobs", results_wanted=want, offset=offset):
+                page = scrape_jobs(
+                    site_name="linkedin",
+                    search_term=search_term,
+                    location=location,
+                    results_wanted=want,
+                    offset=offset,
+                    get_skills=False,
+                )
+            while not stop.is_set():
+                try:
+                    out.put(page, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if page.empty:  # a short page may just be filtered or deduplicated by jobspy
+                break
+            offset += len(page)
+        item = None
+    except Exception as e:
+        item = e
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+def iter_jobs(search_term: str,
+              location: str,
+              num_results: int = 50,
+              page_size: int = PAGE_SIZE,
+              fetch_descriptions: bool = False,
+              max_workers: int = MAX_WORKERS):
+    """
+    Yield LinkedIn search results page by page as they arrive.
+
+    Each page is a DataFrame with get_jobs' column order and a running index,
+    so callers can render the first jobs immediately. The next page is scraped
+    in a background thread while the caller (or fetch_descriptions=True) works
+    on the current one; at most one page is buffered, so memory stays bounded
+    however large num_results is. Postings repeated across pages are dropped.
+    """
+    pages = queue.Queue(maxsize=1)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=tracing.bind(_scrape_pages),
+        args=(search_term, location, num_results, page_size, pages, stop),
+        daemon=True,
     )
-    need = ["title", "company", "location", "job_url", "description"]
-    for c in need:
-        if c not in df.columns:
-            df[c] = ""
-    return df[need + [c for c in df.columns if c not in need]]
+    producer.start()
+    seen = set()
+    start = 0
+    try:
+        while True:
+            page = pages.get()
+            if page is None:
+                return
+            if isinstance(page, Exception):
+                raise page
+            page = _order_columns(page)
+            page = page[~page["job_url"].isin(seen)].drop_duplicates("job_url")
+            if page.empty:
+                continue
+            seen.update(page["job_url"])
+            page.index = range(start, start + len(page))
+            start += len(page)
+            if fetch_descriptions:
+                page = fill_descriptions(page.copy(), max_workers=max_workers)
+            yield page
+    finally:
+        stop.set()
 
 def print_picklist(df: pd.DataFrame):
     print("\nTop Results")
@@ -27,4 +159,4 @@ def print_picklist(df: pd.DataFrame):
         comp  = (row.get("company") or "")[:40]
         loc   = (row.get("location") or "")[:40]
         print(f"[{i}] {title} — {comp} — {loc}")
-    print("------------------------------------------------------------")
\ No newline at end of file
+    print("------------------------------------------------------------")
@@ -0,0 +1,13 @@
+# job_urls.py — LinkedIn job URL helpers; standard library only, so any module can import it cheaply
+import re
+
+_JOB_ID_RES = (re.compile(r"/jobs/view/(\d+)"), re.compile(r"/view/(\d+)"))
+
+
+def linkedin_job_id(url: str) -> str:
+    """Extract the numeric job ID from a LinkedIn job URL ("" if there is none)."""
+    for pattern in _JOB_ID_RES:
+        m = pattern.search(url or "")
+        if m:
+            return m.group(1)
+    return ""
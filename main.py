@@ -1,25 +1,25 @@
 # main.py — ResumeSync (LinkedIn + Resume Match)
 # Author: Shamim Shakil
-
-import json
-from job_spy import get_jobs, print_picklist
-from job_detail import fetch_job_description
-from resume_reader import read_resume_text
-from resume_analyzer import analyze_resume_match
+#
+# Project modules (and through them pandas, jobspy, openai, the PDF/DOCX
+# parsers) are imported inside each flow, so the menu appears immediately
+# and a flow only pays for what it uses. check_import_time.py guards this.
+import tracing
 
 
 def normalize_ai_result(result):
     """Ensure analyzer output is a dict with expected keys."""
+    from match_schema import MatchResult, parse_answer
     if isinstance(result, str):
-        try:
-            result = json.loads(result)
-        except Exception:
+        parsed = parse_answer(result, MatchResult)
+        if parsed is None:
             return {
                 "match_score": 0,
                 "matched_skills": [],
                 "missing_skills": [],
                 "summary": result.strip(),
             }
+        result = parsed
 
     return {
         "match_score": int(result.get("match_score", 0) or 0),
@@ -29,8 +29,62 @@ def normalize_ai_result(result):
     }
 
 
+def print_match_result(result: dict):
+    """Print a normalized analysis result."""
+    print(f"Match Score: {result['match_score']}%")
+    print("Matched Skills:", ", ".join(result["matched_skills"]) or "—")
+    print("Missing Skills:", ", ".join(result["missing_skills"]) or "—")
+    if result["summary"]:
+        print("\nSummary:")
+        print(result["summary"])
+    print("\n" + "-" * 60 + "\n")
+
+
+def _field_text(value) -> str:
+    return (", ".join(map(str, value)) or "—") if isinstance(value, list) else str(value)
+
+
+def print_match_stream(stream) -> dict:
+    """Print a streamed analysis as it arrives; returns the normalized final result."""
+    last = {}
+    shown = set()
+    summary_len = 0
+    labels = (("match_score", "Match Score: {}%"),
+              ("matched_skills", "Matched Skills: {}"),
+              ("missing_skills", "Missing Skills: {}"))
+    for partial in stream:
+        last = partial
+        for key, label in labels:
+            if key in partial and key not in shown and summary_len == 0:
+                print(label.format(_field_text(partial[key])))
+                shown.add(key)
+        summary = partial.get("summary")
+        if isinstance(summary, str) and len(summary) > summary_len:
+            if summary_len == 0:
+                print("\nSummary:")
+            print(summary[summary_len:], end="", flush=True)
+            summary_len = len(summary)
+
+    result = normalize_ai_result(last)
+    if not shown and not summary_len:
+        print_match_result(result)
+        return result
+    if summary_len:
+        print("\n")
+    # Fields that arrived after the summary started, or only with the final result
+    # (with LOCAL_SKILLS the skill lists are added at the very end).
+    late = [(key, label) for key, label in labels if key not in shown]
+    for key, label in late:
+        print(label.format(_field_text(result[key])))
+    print(("\n" if late else "") + "-" * 60 + "\n")
+    return result
+
+
 def offer_resume_analysis(jd_text: str):
     """Prompt user to analyze a resume against the given JD text."""
+    from resume_reader import read_resume_text
+    from prompt_compact import RESUME_CHAR_BUDGET
+    from resume_analyzer import stream_resume_match
     if not jd_text or jd_text.startswith("[No description"):
         return
 
@@ -44,36 +98,29 @@ def offer_resume_analysis(jd_text: str):
         return
 
     try:
-        resume_text = read_resume_text(path)
+        resume_text = read_resume_text(path, max_chars=RESUME_CHAR_BUDGET)
     except Exception as e:
         print(f"Error reading resume: {e}")
         return
 
     print("\nAnalyzing resume vs job description...\n")
     try:
-        raw = analyze_resume_match(resume_text, jd_text)
-        result = normalize_ai_result(raw)
+        print_match_stream(stream_resume_match(resume_text, jd_text))
     except Exception as e:
-        print(f"Analysis failed: {e}")
-        return
-
-    print(f"Match Score: {result['match_score']}%")
-    print("Matched Skills:", ", ".join(result["matched_skills"]) or "—")
-    print("Missing Skills:", ", ".join(result["missing_skills"]) or "—")
-    if result["summary"]:
-        print("\nSummary:")
-        print(result["summary"])
-    print("\n" + "-" * 60 + "\n")
+        print(f"\nAnalysis failed: {e}")
 
 
 def search_flow():
     """Browse LinkedIn jobs and fetch full descriptions."""
+    from job_spy import get_jobs, print_picklist
+    from job_detail import fetch_job_description
+    from job_corpus import remember_jobs
     role = input("Job title (e.g., UX Researcher): ").strip() or "UX Designer"
     loc = input("Location (e.g., United States): ").strip() or "United States"
 
-    print("\nSearching LinkedIn jobs...\n")
+    print("\nSearching LinkedIn jobs and fetching descriptions...\n")
     try:
-        jobs = get_jobs(role, loc, num_results=5)
+        jobs = get_jobs(role, loc, num_results=5, fetch_descriptions=True)
     except Exception as e:
         print(f"Search failed: {e}")
         return
@@ -81,6 +128,7 @@ def search_flow():
     if jobs.empty:
         print("No results. Try a broader term/location.\n")
         return
+    remember_jobs(jobs)
 
     while True:
         print_picklist(jobs)
@@ -108,8 +156,11 @@ def search_flow():
         print(f"Location: {row.get('location')}")
         print(f"URL     : {row.get('job_url')}\n")
 
-        print("Fetching full job description...")
-        jd_text = fetch_job_description(row.get("job_url", "")) or "[No description available — page may be private.]"
+        desc = row.get("description")
+        jd_text = desc.strip() if isinstance(desc, str) else ""
+        if not jd_text:
+            print("Fetching full job description...")
+            jd_text = fetch_job_description(row.get("job_url", "")) or "[No description available — page may be private.]"
 
         print("\nFull Job Description\n")
         print(jd_text)
@@ -120,13 +171,19 @@ def search_flow():
 
 def url_flow():
     """Paste a public LinkedIn URL, fetch its description, then analyze resume."""
+    import pandas as pd
+    from job_detail import fetch_job_description
+    from job_corpus import remember_jobs
     url = input("Paste a LinkedIn public job URL: ").strip()
     if not url:
         print("URL cannot be empty.")
         return
 
     print("\nFetching full job description...\n")
-    jd_text = fetch_job_description(url) or "[No description available — page may be private.]"
+    jd_text = fetch_job_description(url)
+    if jd_text:
+        remember_jobs(pd.DataFrame([{"job_url": url, "description": jd_text}]))
+    jd_text = jd_text or "[No description available — page may be private.]"
 
     print("Full Job Description\n")
     print(jd_text)
@@ -135,23 +192,243 @@ def url_flow():
     offer_resume_analysis(jd_text)
 
 
+def _ask_int(prompt: str, default: int) -> int:
+    raw = input(prompt).strip()
+    return int(raw) if raw.isdigit() else default
+
+
+def rank_flow():
+    """Rank a whole search result set against a resume locally, then AI-analyze the top matches."""
+    import pandas as pd
+    from job_spy import iter_jobs, fill_descriptions
+    from resume_reader import read_resume_text
+    from prompt_compact import RESUME_CHAR_BUDGET
+    from resume_analyzer import analyze_resume_matches
+    from dedupe import describe_report
+    from ranker import rank_jobs
+    from prompt_compact import compaction_stats
+    from job_corpus import remember_jobs, remember_analysis
+    role = input("Job title (e.g., UX Researcher): ").strip() or "UX Designer"
+    loc = input("Location (e.g., United States): ").strip() or "United States"
+    count = _ask_int("How many postings to rank (default 50): ", 50)
+    path = input("Enter resume path (.pdf/.docx/.txt): ").strip()
+    if not path:
+        print("No file provided. Skipping ranking.\n")
+        return
+
+    try:
+        resume_text = read_resume_text(path, max_chars=RESUME_CHAR_BUDGET)
+    except Exception as e:
+        print(f"Error reading resume: {e}")
+        return
+
+    print("\nSearching LinkedIn jobs and fetching descriptions...\n")
+    pages = []
+    try:
+        # Descriptions for each page are fetched while the next page is still loading.
+        for page in iter_jobs(role, loc, num_results=count):
+            pages.append(fill_descriptions(page.copy()))
+            print(f"  loaded {sum(len(p) for p in pages)} postings...")
+    except Exception as e:
+        print(f"Search failed: {e}")
+        if not pages:
+            return
+
+    if not pages:
+        print("No results. Try a broader term/location.\n")
+        return
+
+    jobs = pd.concat(pages)
+    remember_jobs(jobs)
+    ranked = rank_jobs(resume_text, jobs)
+    print(f"\nTop Matches (local ranking of {len(ranked)} postings)")
+    print("------------------------------------------------------------")
+    for pos, (_, row) in enumerate(ranked.head(10).iterrows()):
+        title = (row.get("title") or "")[:50]
+        comp = (row.get("company") or "")[:30]
+        print(f"[{pos}] {row['rank_score']:5.1f}  {title} — {comp}")
+    print("------------------------------------------------------------")
+
+    top_k = _ask_int("\nRun AI analysis on how many of the top matches? (default 3, 0 to skip): ", 3)
+    top = ranked.head(top_k)
+    top = top[top["description"].apply(lambda d: isinstance(d, str) and bool(d.strip()))]
+    if top.empty:
+        return
+
+    print(f"\nAnalyzing {len(top)} jobs concurrently...\n")
+    done = []
+    try:
+        results = analyze_resume_matches(
+            resume_text,
+            top["description"].tolist(),
+            on_result=lambda i, _: done.append(i) or print(f"  {len(done)}/{len(top)} complete"),
+        )
+    except Exception as e:
+        print(f"Analysis failed: {e}\n")
+        return
+    if describe_report(results.dedupe):
+        print(describe_report(results.dedupe))
+    for (_, row), raw in zip(top.iterrows(), results):
+        print(f"\n=== {row.get('title')} — {row.get('company')} ===")
+        print(f"URL: {row.get('job_url')}\n")
+        if "error" in raw:
+            print(f"Analysis failed: {raw['error']}")
+            continue
+        result = normalize_ai_result(raw)
+        remember_analysis(row.get("job_url"), result)
+        print_match_result(result)
+
+    stats = compaction_stats()
+    if stats["tokens_saved"]:
+        print(f"Prompt compaction saved {stats['tokens_saved']} of {stats['tokens_before']} input tokens "
+              f"({stats['tokenizer']} count).\n")
+
+
+def saved_search_flow():
+    """Re-run a saved search; new, changed and not-yet-scored postings are analyzed."""
+    from saved_search import incremental_search, search_key, get_store, resume_hash
+    from resume_reader import read_resume_text
+    from prompt_compact import RESUME_CHAR_BUDGET
+    from resume_analyzer import analyze_resume_matches
+    from dedupe import describe_report
+    from job_corpus import remember_jobs, remember_analysis
+    role = input("Job title (e.g., UX Researcher): ").strip() or "UX Designer"
+    loc = input("Location (e.g., United States): ").strip() or "United States"
+    count = _ask_int("How many postings to check (default 25): ", 25)
+    path = input("Resume path to score new postings (optional, Enter to skip): ").strip()
+
+    resume_text = None
+    if path:
+        try:
+            resume_text = read_resume_text(path, max_chars=RESUME_CHAR_BUDGET)
+        except Exception as e:
+            print(f"Error reading resume: {e}")
+            return
+
+    print("\nChecking for new or changed postings...\n")
+    rkey = resume_hash(resume_text) if resume_text else None
+    try:
+        fresh = incremental_search(role, loc, num_results=count, resume_hash=rkey)
+    except Exception as e:
+        print(f"Search failed: {e}")
+        return
+
+    if fresh.empty:
+        print("Nothing new since the last check.\n")
+        return
+
+    remember_jobs(fresh)
+    print(f"{len(fresh)} new, changed or unscored postings")
+    print("------------------------------------------------------------")
+    for _, row in fresh.iterrows():
+        print(f"[{row['change']:>7}] {(row.get('title') or '')[:50]} — {(row.get('company') or '')[:30]}")
+    print("------------------------------------------------------------")
+    if not resume_text:
+        return
+
+    fresh = fresh[fresh["description"].apply(lambda d: isinstance(d, str) and bool(d.strip()))]
+    try:
+        results = analyze_resume_matches(resume_text, fresh["description"].tolist())
+    except Exception as e:
+        print(f"Analysis failed: {e}\n")
+        return
+    store, key = get_store(), search_key(role, loc)
+    print()
+    if describe_report(results.dedupe):
+        print(describe_report(results.dedupe))
+    for (_, row), raw in zip(fresh.iterrows(), results):
+        if "error" in raw:
+            print(f"  —   {row.get('title')} — analysis failed: {raw['error']}")
+            continue
+        result = normalize_ai_result(raw)
+        store.record_analysis(key, row["job_key"], rkey, result)
+        remember_analysis(row.get("job_url"), result)
+        print(f"{result['match_score']:>3}%  {row.get('title')} — {row.get('company')}")
+    print()
+
+
+def corpus_flow():
+    """Search every posting scraped so far, offline, and optionally re-rank against a resume."""
+    from job_corpus import get_corpus
+    from resume_reader import read_resume_text
+    from prompt_compact import RESUME_CHAR_BUDGET
+    from ranker import rank_jobs
+    corpus = get_corpus()
+    if corpus is None:
+        print("The local job corpus is disabled (JOB_CORPUS=0).\n")
+        return
+    query = input("Search past postings (keywords, Enter for most recent): ").strip()
+    path = input("Resume path to re-rank results (optional, Enter to skip): ").strip()
+
+    found = corpus.search(query, limit=500)
+    if found.empty:
+        print(f"No stored postings match. The corpus holds {len(corpus)} postings.\n")
+        return
+
+    if path:
+        try:
+            found = rank_jobs(read_resume_text(path, max_chars=RESUME_CHAR_BUDGET), found)
+        except Exception as e:
+            print(f"Error reading resume: {e}")
+            return
+
+    print(f"\n{len(found)} matching postings (of {len(corpus)} stored)")
+    print("------------------------------------------------------------")
+    for _, row in found.head(10).iterrows():
+        score = f"{row['rank_score']:5.1f}  " if "rank_score" in found.columns else ""
+        print(f"{score}{(row.get('title') or '')[:50]} — {(row.get('company') or '')[:30]}")
+        print(f"       {row.get('job_url')}")
+    print("------------------------------------------------------------\n")
+
+
+def print_trace(snapshot: dict):
+    """Where a flow's time went (TRACING=1): slowest spans first, then counters."""
+    spans = sorted(snapshot["spans"].items(), key=lambda kv: -kv[1]["total_ms"])
+    if not spans:
+        return
+    print("Timing breakdown")
+    print("------------------------------------------------------------")
+    for name, s in spans:
+        print(f"{name:<22} {s['count']:>5}x  {s['total_ms']:>10.1f} ms total  {s['mean_ms']:>8.1f} ms mean")
+    for series, value in snapshot["counters"].items():
+        print(f"{series:<44} {value:>10g}")
+    print("------------------------------------------------------------\n")
+
+
+def run_flow(flow):
+    """Run one menu flow; with tracing on, print its timing breakdown afterwards."""
+    with tracing.collect() as trace:
+        flow()
+    if tracing.enabled():
+        print_trace(trace.snapshot())
+
+
 def main():
     print("\nResumeSync — LinkedIn Job + Resume Match\n")
     while True:
         print("1) Browse LinkedIn Jobs (via JobSpy)")
         print("2) Paste LinkedIn Public Job URL")
-        print("3) Exit")
+        print("3) Rank All Search Results Against Your Resume")
+        print("4) Check a Saved Search for New Postings")
+        print("5) Search Past Postings (offline)")
+        print("6) Exit")
         choice = input("\nChoose an option: ").strip()
 
         if choice == "1":
-            search_flow()
+            run_flow(search_flow)
         elif choice == "2":
-            url_flow()
+            run_flow(url_flow)
         elif choice == "3":
+            run_flow(rank_flow)
+        elif choice == "4":
+            run_flow(saved_search_flow)
+        elif choice == "5":
+            run_flow(corpus_flow)
+        elif choice == "6":
             print("Goodbye!")
             break
         else:
-            print("Invalid choice, please select 1–3.\n")
+            print("Invalid choice, please select 1–6.\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+# match_schema.py — response schemas and tolerant JSON parsing for model answers
+import re
+import json
+from typing import List
+from pydantic import BaseModel, ValidationError, field_validator
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_decoder = json.JSONDecoder()
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _to_score(value) -> int:
+    """Accept 85, 85.4, "85" or "85%", clamped to 0–100."""
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip()
+    return min(100, max(0, round(float(value))))
+
+
+def _to_text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+class MatchResult(BaseModel):
+    match_score: int
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+    summary: str = ""
+
+    @field_validator("match_score", mode="before")
+    @classmethod
+    def _score(cls, value):
+        return _to_score(value)
+
+    @field_validator("matched_skills", "missing_skills", mode="before")
+    @classmethod
+    def _skills(cls, value):
+        return _as_list(value)
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary(cls, value):
+        return _to_text(value)
+
+
+class SummaryResult(BaseModel):
+    """Answer shape when skills come from the local matcher (LOCAL_SKILLS)."""
+    match_score: int
+    summary: str = ""
+
+    @field_validator("match_score", mode="before")
+    @classmethod
+    def _score(cls, value):
+        return _to_score(value)
+
+    @field_validator("summary", mode="before")
+    @classmethod
+    def _summary(cls, value):
+        return _to_text(value)
+
+
+class ResumeProfile(BaseModel):
+    titles: List[str]
+    years_experience: float
+    skills: List[str]
+    tools: List[str]
+    domains: List[str]
+    education: List[str]
+
+    @field_validator("titles", "skills", "tools", "domains", "education", mode="before")
+    @classmethod
+    def _lists(cls, value):
+        return _as_list(value)
+
+    @field_validator("years_experience", mode="before")
+    @classmethod
+    def _years(cls, value):
+        try:
+            return float(str(value).split()[0].rstrip("+")) if value not in (None, "") else 0.0
+        except (ValueError, IndexError):
+            return 0.0
+
+
+def _compact_schema(node):
+    if isinstance(node, dict):
+        return {k: _compact_schema(v) for k, v in node.items() if k not in ("title", "default")}
+    if isinstance(node, list):
+        return [_compact_schema(v) for v in node]
+    return node
+
+
+def response_format(model) -> dict:
+    """
+    OpenAI structured-output `response_format` for a pydantic model: strict
+    JSON schema, every field required, no extra keys, no titles or defaults
+    (keeps the schema the provider caches small). Properties keep the model's field
+    order, so match_score is generated first.
+    """
+    schema = _compact_schema(model.model_json_schema())
+    schema["required"] = list(schema["properties"])
+    schema["additionalProperties"] = False
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "strict": True, "schema": schema},
+    }
+
+
+def extract_json(text: str):
+    """
+    The first JSON object in a model answer, tolerating ```json fences and
+    prose before or after it. Raises ValueError if there is none.
+    """
+    text = (text or "").strip()
+    candidates = [m.group(1).strip() for m in _FENCE_RE.finditer(text)] + [text]
+    for candidate in candidates:
+        start = candidate.find("{")
+        while start != -1:
+            try:
+                value, _ = _decoder.raw_decode(candidate, start)
+                if isinstance(value, dict):
+                    return value
+            except ValueError:
+                pass
+            start = candidate.find("{", start + 1)
+    raise ValueError("no JSON object in model answer")
+
+
+def parse_answer(text: str, model):
+    """Validated dict for `model` from a raw answer, or None if it can't be recovered."""
+    try:
+        return model.model_validate(extract_json(text)).model_dump()
+    except (ValueError, ValidationError, TypeError):
+        return None
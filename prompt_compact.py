@@ -0,0 +1,246 @@
+# prompt_compact.py — fit resumes and job descriptions into a token budget before prompting
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import NamedTuple
+
+RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKENS", 1200))
+JOB_TOKEN_BUDGET = int(os.getenv("PROMPT_JOB_TOKENS", 900))
+# Resume extraction can stop at this many characters: compaction cuts everything
+# past it anyway (about 4 characters a token, doubled for lines it drops).
+RESUME_CHAR_BUDGET = int(os.getenv("RESUME_CHAR_BUDGET", RESUME_TOKEN_BUDGET * 8))
+TOKENIZER_MODEL = "gpt-4o-mini"
+
+# Section headings, checked in this order; lower priority numbers are kept first.
+DROP = None
+_SECTION_RULES = [
+    (DROP, re.compile(r"benefit|perks|what we offer|equal (employment )?opportunit|\beeo\b|diversity|"
+                      r"accommodation|privacy|e-verify|disclaimer|how to apply|compensation|salary|pay range")),
+    (2, re.compile(r"preferred|nice[- ]to[- ]have|bonus|plus\b|desired")),
+    (0, re.compile(r"requirement|qualification|must[- ]have|what you('ll| will)? bring|looking for|who you are|"
+                   r"about you|skills|experience|you have|you bring")),
+    (1, re.compile(r"responsibilit|what you('ll| will)? do|the role|your role|dut(y|ies)|day[- ]to[- ]day|"
+                   r"accountabilit|impact|the job|position summary|overview")),
+    (4, re.compile(r"^\W*about\b|who we are|our (mission|story|values)|company")),
+]
+UNTITLED = 3
+
+# Boilerplate sentences that show up outside their own section (usually the last paragraph).
+# Only a standalone sentence or bullet of at most BOILERPLATE_MAX_WORDS words is dropped,
+# so text that lost its line breaks upstream is never dropped along with it.
+BOILERPLATE_MAX_WORDS = 50
+_BOILERPLATE_RE = re.compile(
+    r"equal opportunity employer|without regard to|reasonable accommodation|e-verify|protected veteran|"
+    r"all qualified applicants|does not discriminate|national origin|sexual orientation|pay transparency",
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(r"^\s*(?:#{1,6}\s*)?(?:\*\*|__)?([A-Za-z][^.!?]{1,60}?)(?:\*\*|__)?\s*:?\s*$")
+# Bullets (extract_job_text starts <li> items with "•") and markdown list items are never headings.
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[•●▪◦]|[-*+]\s|\d{1,2}[.)]\s)")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_BULLET_RE = re.compile(r"\s*[•●▪◦]\s*")
+_SPACE_RE = re.compile(r"[ \t ]+")
+# Rough stand-in for BPE pre-tokenization when tiktoken isn't available.
+_PIECE_RE = re.compile(r"\s?[A-Za-z]+|\s?\d{1,3}|\s?[^\sA-Za-z\d]+|\s+")
+
+_encoder = None
+_encoder_lock = threading.Lock()
+_stats = {"calls": 0, "tokens_before": 0, "tokens_after": 0}
+_stats_lock = threading.Lock()
+
+
+class CompactResult(NamedTuple):
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _get_encoder():
+    """tiktoken encoding for the model, or None (not installed, or its BPE file can't be loaded)."""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            try:
+                import tiktoken
+                try:
+                    _encoder = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+                except KeyError:
+                    _encoder = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoder = False
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    """Token count with the model's tokenizer (tiktoken), or a close estimate without it."""
+    if not text:
+        return 0
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    # Common words are one token; long ones split about every 8 characters.
+    return sum(1 + (len(p.strip()) - 1) // 8 if p.strip() else 1 for p in _PIECE_RE.findall(text))
+
+
+def _longest_prefix(parts: list, sep: str, max_tokens: int) -> int:
+    lo, hi = 0, len(parts)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(sep.join(parts[:mid])) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` that fits in max_tokens: whole lines, then the next line's first words."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    lines = text.split("\n")
+    n = _longest_prefix(lines, "\n", max_tokens)
+    head = "\n".join(lines[:n])
+    # Fill what's left with the start of the next line.
+    left = max_tokens - count_tokens(head + "\n") if n else max_tokens
+    words = lines[n].split(" ")
+    tail = " ".join(words[:_longest_prefix(words, " ", left)]) if left > 0 else ""
+    return "\n".join(part for part in (head, tail) if part)
+
+
+def _clean_lines(text: str, seen: set) -> list:
+    """
+    Collapse whitespace line by line, dropping short boilerplate sentences and
+    sentences already seen (case-insensitive). Lines are split into bullet
+    items, then sentences; line breaks are kept.
+    """
+    lines = []
+    for raw in (text or "").splitlines():
+        lead = "• " if raw.lstrip().startswith(("•", "●", "▪", "◦")) else ""  # keep a bullet's marker
+        items = []
+        for item in _BULLET_RE.split(_SPACE_RE.sub(" ", raw).strip()):
+            kept = []
+            for sentence in _SENTENCE_RE.split(item.strip()):
+                norm = sentence.lower().strip(" -*")
+                if not norm:
+                    continue
+                if _BOILERPLATE_RE.search(sentence) and len(sentence.split()) <= BOILERPLATE_MAX_WORDS:
+                    continue
+                if len(norm) > 20:  # short lines ("Python", "Remote") may legitimately repeat
+                    if norm in seen:
+                        continue
+                    seen.add(norm)
+                kept.append(sentence)
+            if kept:
+                items.append(" ".join(kept))
+        if items:
+            lines.append(lead + " • ".join(items))
+    return lines
+
+
+def _is_heading(line: str) -> bool:
+    """
+    A line ending in ":", a markdown or bold heading, or a short line naming a
+    known section ("Requirements", "About the role"). Title Case alone isn't
+    enough: short bullets like "Design Systems" would split off as sections.
+    """
+    m = _HEADING_RE.match(line)
+    if not m or _LIST_ITEM_RE.match(line) or len(line.split()) > 8:
+        return False
+    stripped = line.strip()
+    if stripped.endswith(":") or stripped.startswith(("#", "**", "__")):
+        return True
+    title = m.group(1)
+    return (len(title.split()) <= 5 and not any(c.isdigit() for c in title)
+            and _heading_priority(title) != UNTITLED)
+
+
+def _heading_priority(heading: str) -> int:
+    heading = heading.lower()
+    for priority, pattern in _SECTION_RULES:
+        if pattern.search(heading):
+            return priority
+    return UNTITLED
+
+
+def _sections(lines: list) -> list:
+    """[(priority, [lines])] in document order; text before the first heading is untitled."""
+    sections = [(UNTITLED, [])]
+    for line in lines:
+        if _is_heading(line):
+            sections.append((_heading_priority(line), [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(p, body) for p, body in sections if body]
+
+
+def _record(result: CompactResult) -> CompactResult:
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["tokens_before"] += result.tokens_before
+        _stats["tokens_after"] += result.tokens_after
+    return result
+
+
+@lru_cache(maxsize=512)
+def _compact_job(text: str, max_tokens: int) -> CompactResult:
+    before = count_tokens(text)
+    if before <= max_tokens:
+        return CompactResult(text, before, before)
+    sections = [(p, "\n".join(body)) for p, body in _sections(_clean_lines(text, set())) if p is not DROP]
+    # Fill the budget by relevance (requirements, responsibilities, ...), then restore document order.
+    # A section that doesn't fit is skipped so smaller ones after it still can; whatever
+    # budget is left then goes to the start of the most relevant skipped section.
+    order = sorted(range(len(sections)), key=lambda i: (sections[i][0], i))
+    kept, skipped, left = {}, [], max_tokens
+    for i in order:
+        cost = count_tokens(sections[i][1]) + 1
+        if cost > left:
+            skipped.append(i)
+            continue
+        kept[i], left = sections[i][1], left - cost
+    if skipped and left > 20:
+        kept[skipped[0]] = truncate_to_tokens(sections[skipped[0]][1], left - 1)
+    out = "\n\n".join(kept[i] for i in sorted(kept))
+    return CompactResult(out, before, count_tokens(out))
+
+
+@lru_cache(maxsize=64)
+def _compact_resume(text: str, max_tokens: int) -> CompactResult:
+    before = count_tokens(text)
+    if before <= max_tokens:
+        return CompactResult(text, before, before)
+    out = truncate_to_tokens("\n".join(_clean_lines(text, set())), max_tokens)
+    return CompactResult(out, before, count_tokens(out))
+
+
+def compact_job_text(text: str, max_tokens: int = JOB_TOKEN_BUDGET) -> CompactResult:
+    """
+    Job description trimmed to `max_tokens`; text that already fits is
+    returned unchanged. Otherwise boilerplate (EEO, benefits, perks, how to
+    apply) and repeated sentences are dropped, and when it is still too long,
+    requirements and responsibilities are kept ahead of company blurbs.
+    Sections are found from heading lines, so the text should keep its line
+    breaks (extract_job_text puts each paragraph, bullet and heading on its own).
+    """
+    return _record(_compact_job(text or "", max_tokens))
+
+
+def compact_resume_text(text: str, max_tokens: int = RESUME_TOKEN_BUDGET) -> CompactResult:
+    """Resume cut to `max_tokens` (whitespace collapsed, repeated lines dropped); unchanged if it fits."""
+    return _record(_compact_resume(text or "", max_tokens))
+
+
+def compaction_stats() -> dict:
+    """Running totals across all compact_* calls in this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    stats["tokenizer"] = "tiktoken" if _get_encoder() is not None else "estimate"
+    return stats
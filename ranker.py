@@ -0,0 +1,127 @@
+# ranker.py — local BM25 pre-ranking of job postings (no network, no API calls)
+import re
+import numpy as np
+import pandas as pd
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+# Bytes a token can contain; translating every other byte (and "?" for non-ASCII)
+# to a space lets bytes.split() find token candidates without the regex. \x01
+# survives so it can mark where one document ends and the next begins (not NUL:
+# numpy drops trailing NULs when comparing strings).
+_TOKEN_BYTES = b"abcdefghijklmnopqrstuvwxyz0123456789+#."
+_DOC_BREAK = "\x01"
+_SEPARATORS = bytes(c if c in _TOKEN_BYTES or c == ord(_DOC_BREAK) else 32 for c in range(256))
+
+_STOPWORDS = frozenset("""
+a about above after all also an and any are as at be because been being both but by
+can could did do does doing for from had has have having he her here hers him his how
+i if in into is it its just may me more most must my no nor not of off on once only or
+other our ours out over own per same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what
+when where which while who whom why will with within would you your yours
+""".split())
+
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens, keeping tech names like c++, c# and node.js intact."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def _doc_terms(docs: pd.Series) -> tuple:
+    """
+    Tokenize every document at once, the same way as tokenize().
+
+    Returns (doc_ids, term_ids, terms): one doc/term id pair per non-stopword
+    token, and the distinct terms by id. The documents are joined and split
+    into candidate pieces in C; only the distinct pieces that hold a "." or
+    start with "+"/"#" ("e.g.", "..net") go through the regex.
+    """
+    text = docs.str.replace(_DOC_BREAK, " ", regex=False).str.cat(sep=f" {_DOC_BREAK} ").lower()
+    pieces = text.encode("ascii", "replace").translate(_SEPARATORS).decode("ascii").split()
+    piece_ids, uniq = pd.factorize(np.array(pieces, dtype=object))
+    breaks = np.flatnonzero(uniq == _DOC_BREAK)
+    is_break = piece_ids == breaks[0] if breaks.size else np.zeros(len(piece_ids), dtype=bool)
+    piece_docs = np.cumsum(is_break)
+
+    # Tokens of each distinct piece (usually itself, or nothing for stopwords), flattened.
+    tokens_of = [[] if p == _DOC_BREAK else
+                 tokenize(p) if "." in p or p[0] in "+#" else
+                 [] if p in _STOPWORDS else [p] for p in uniq]
+    n_tokens = np.fromiter(map(len, tokens_of), dtype=np.int64, count=len(tokens_of))
+    first = np.cumsum(n_tokens) - n_tokens
+    term_of_token, terms = pd.factorize(np.array([t for toks in tokens_of for t in toks], dtype=object))
+
+    # Expand every piece occurrence into its tokens.
+    reps = n_tokens[piece_ids]
+    offsets = np.arange(int(reps.sum())) - np.repeat(np.cumsum(reps) - reps, reps)
+    term_ids = term_of_token[np.repeat(first[piece_ids], reps) + offsets]
+    return np.repeat(piece_docs, reps), term_ids, terms
+
+
+def _term_matrix(docs: pd.Series):
+    """
+    Build a sparse (COO) document-term count matrix.
+
+    Returns (doc_ids, term_ids, counts, vocab, doc_len) where the first three
+    arrays hold one entry per distinct (document, term) pair.
+    """
+    token_docs, token_terms, terms = _doc_terms(docs)
+    vocab = {t: i for i, t in enumerate(terms)}
+    n_terms = max(len(vocab), 1)
+    # np.unique over (doc, term) pairs collapses repeats into counts.
+    uniq, counts = np.unique(token_docs * n_terms + token_terms, return_counts=True)
+    doc_ids, term_ids = np.divmod(uniq, n_terms)
+    lengths = np.bincount(token_docs, minlength=len(docs))
+    return doc_ids, term_ids, counts.astype(np.float64), vocab, lengths.astype(np.float64)
+
+
+def bm25_scores(query_text: str, docs: list, k1: float = K1, b: float = B) -> np.ndarray:
+    """Okapi BM25 score of every document in `docs` (a list or Series of strings) against `query_text`."""
+    n_docs = len(docs)
+    if n_docs == 0:
+        return np.zeros(0)
+    docs = pd.Series(np.asarray(docs, dtype=object)).fillna("").astype(str)
+    doc_ids, term_ids, tf, vocab, doc_len = _term_matrix(docs)
+    if not vocab:
+        return np.zeros(n_docs)
+
+    # Query weights: log-scaled term frequency of resume words found in the corpus.
+    q_counts = np.zeros(len(vocab))
+    for t in tokenize(query_text):
+        idx = vocab.get(t)
+        if idx is not None:
+            q_counts[idx] += 1
+    q_weight = np.log1p(q_counts)
+
+    df = np.bincount(term_ids, minlength=len(vocab))
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+    avgdl = doc_len.mean() or 1.0
+    norm = k1 * (1 - b + b * doc_len[doc_ids] / avgdl)
+    contrib = idf[term_ids] * q_weight[term_ids] * tf * (k1 + 1) / (tf + norm)
+    return np.bincount(doc_ids, weights=contrib, minlength=n_docs)
+
+
+def rank_jobs(resume_text: str, jobs_df: pd.DataFrame, top_k: int = None) -> pd.DataFrame:
+    """
+    Rank a get_jobs() DataFrame against a resume with BM25.
+
+    Title and description are scored together. Returns a copy sorted best
+    first with a `rank_score` column (0–100, relative to the best match),
+    trimmed to `top_k` rows when given. The original index is kept so rows
+    can still be looked up in the source frame.
+    """
+    if jobs_df is None or jobs_df.empty:
+        return jobs_df
+    cols = [c for c in ("title", "description") if c in jobs_df.columns]
+    text = [jobs_df[c].fillna("").astype(str) for c in cols] or [pd.Series("", index=jobs_df.index)]
+    docs = text[0].str.cat(text[1:], sep=" ") if len(text) > 1 else text[0]
+    scores = bm25_scores(resume_text, docs)
+    best = scores.max() if scores.size else 0
+    ranked = jobs_df.copy()
+    ranked["rank_score"] = np.round(100 * scores / best, 1) if best > 0 else 0.0
+    ranked = ranked.sort_values("rank_score", ascending=False, kind="stable")
+    return ranked.head(top_k) if top_k else ranked
@@ -0,0 +1,173 @@
+# rate_limit.py — rate limiting helpers for API and scraping calls
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket for asyncio code: `per_minute` tokens refill continuously,
+    up to `capacity` (defaults to one minute's worth, i.e. the burst allowed
+    by an RPM/TPM quota). Waiters are served first come, first served.
+
+    Create one per event loop (e.g. per asyncio.run batch).
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity or per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        """Wait until `amount` tokens are available, then take them."""
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+# =========================
+# PER-HOST ADAPTIVE THROTTLE (threads)
+# =========================
+
+THROTTLE_STATUSES = {429, 999, 503}  # 999 is LinkedIn's "request denied"
+
+
+class HostThrottled(Exception):
+    """Raised when a host is throttling us and a request should not be sent now."""
+
+
+def parse_retry_after(value) -> float:
+    """Retry-After header (seconds or HTTP date) as seconds from now, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostThrottle:
+    """
+    AIMD rate limiter plus circuit breaker for one host, shared by all threads.
+
+    - Requests are spaced at 1/rate seconds. Each success adds `increase`
+      req/s (up to max_rate); each throttle response multiplies the rate by
+      `decrease` (down to min_rate) and blocks the host for Retry-After.
+    - `trip_after` consecutive throttle responses open the circuit for
+      `cooldown` seconds: acquire() then raises HostThrottled immediately and
+      allow_fallback() is False, so callers stop adding load.
+    - `on_throttle(host)` is called on every throttle response (e.g. to rotate
+      the user agent).
+    """
+
+    def __init__(self, host: str, rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 10.0,
+                 increase: float = 0.1, decrease: float = 0.5, trip_after: int = 3,
+                 cooldown: float = 60.0, max_wait: float = 30.0, on_throttle=None):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.trip_after = trip_after
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self.on_throttle = on_throttle
+        self.consecutive_throttles = 0
+        self.throttled_total = 0
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds until the next request may be sent (Retry-After, spacing, or an open circuit)."""
+        with self._lock:
+            return max(0.0, max(self._next_slot, self._blocked_until, self._open_until) - time.monotonic())
+
+    def allow_fallback(self) -> bool:
+        """Extra requests (e.g. a fallback endpoint) are only worth sending while the host is healthy."""
+        return not self.circuit_open and self.consecutive_throttles == 0
+
+    def acquire(self):
+        """
+        Block until this thread may send the next request to the host.
+
+        Slots are not reserved ahead of time: a sleeping thread re-checks on
+        waking, so a rate cut or Retry-After applies to everyone still waiting.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._open_until:
+                    raise HostThrottled(f"{self.host} circuit open for {self._open_until - now:.0f}s")
+                wait = max(self._next_slot, self._blocked_until) - now
+                if wait <= 0:
+                    self._next_slot = now + 1.0 / self.rate
+                    return
+                if wait > self.max_wait:
+                    raise HostThrottled(f"{self.host} throttled for {wait:.0f}s")
+            time.sleep(wait)
+
+    def record(self, status_code: int, retry_after: float = None):
+        """Feed back a response status (and parsed Retry-After, if any)."""
+        throttled = status_code in THROTTLE_STATUSES
+        with self._lock:
+            now = time.monotonic()
+            if throttled:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.consecutive_throttles += 1
+                self.throttled_total += 1
+                pause = retry_after if retry_after is not None else 1.0 / self.rate
+                self._blocked_until = max(self._blocked_until, now + pause)
+                if self.consecutive_throttles >= self.trip_after:
+                    self._open_until = now + max(self.cooldown, pause)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                self.consecutive_throttles = 0
+        if throttled and self.on_throttle:
+            self.on_throttle(self.host)
+
+    def snapshot(self) -> dict:
+        return {
+            "host": self.host,
+            "rate": round(self.rate, 3),
+            "consecutive_throttles": self.consecutive_throttles,
+            "throttled_total": self.throttled_total,
+            "circuit_open": self.circuit_open,
+        }
+
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+
+def get_host_throttle(host: str, **kwargs) -> HostThrottle:
+    """Process-wide HostThrottle for `host` (kwargs only apply on first creation)."""
+    with _throttles_lock:
+        throttle = _throttles.get(host)
+        if throttle is None:
+            throttle = _throttles[host] = HostThrottle(host, **kwargs)
+        return throttle
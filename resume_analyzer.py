@@ -1,52 +1,608 @@
 # resume_analyzer functions
 import os
+import re
 import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from functools import lru_cache
 from dotenv import load_dotenv
-from openai import OpenAI
+import tracing
+from cache_store import SQLiteCache, default_cache_path
+from rate_limit import AsyncTokenBucket
+from dedupe import group_texts, dedupe_report, DEDUPE_THRESHOLD
+from prompt_compact import compact_job_text, compact_resume_text, count_tokens
+from skill_matcher import match_skills
+from match_schema import MatchResult, SummaryResult, ResumeProfile, response_format, parse_answer, _to_score
 
-load_dotenv()
-USE_MOCK = os.getenv("USE_MOCK", "false").lower() == "true"
-client = None
+load_dotenv()  # cheap; the settings below may come from .env
+USE_MOCK = os.getenv("USE_MOCK", "false").lower() == "true"  # offline: local skill matching only
+# Skills come from the local matcher and the model only scores and summarizes.
+LOCAL_SKILLS = os.getenv("LOCAL_SKILLS", "false").lower() == "true"
+# Ask for schema-enforced JSON (response_format=json_schema); turn off for servers without support.
+STRUCTURED_OUTPUT = os.getenv("STRUCTURED_OUTPUT", "true").lower() == "true"
 
-if not USE_MOCK:
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.3
+MAX_TOKENS = 300
+SUMMARY_MAX_TOKENS = 200  # LOCAL_SKILLS answers carry no skill lists
+PROFILE_MAX_TOKENS = 350
+PROMPT_VERSION = "5"  # bump whenever the prompt text changes to invalidate cached results
+
+# Static instructions always go first (system message) and never contain
+# per-call text, so every request shares a byte-identical prefix that the
+# provider's prompt cache can reuse.
+MATCH_INSTRUCTIONS = (
+    "You are an assistant evaluating job fit. "
+    "Compare the RESUME and JOB DESCRIPTION in the user message. "
+    "Return JSON with keys, in this order: match_score (0–100), matched_skills, missing_skills, summary. "
+    "List at most 8 short items per skill list and keep the summary under 80 words."
+)
+PROFILE_MATCH_INSTRUCTIONS = (
+    "You are an assistant evaluating job fit. "
+    "Compare the CANDIDATE PROFILE (extracted from their resume) and JOB DESCRIPTION in the user message. "
+    "Return JSON with keys, in this order: match_score (0–100), matched_skills, missing_skills, summary. "
+    "List at most 8 short items per skill list and keep the summary under 80 words."
+)
+SUMMARY_INSTRUCTIONS = (
+    "You are an assistant evaluating job fit. "
+    "Compare the RESUME (or CANDIDATE PROFILE) and JOB DESCRIPTION in the user message. "
+    "The matched and missing skills have already been identified and are listed after the job description. "
+    "Return JSON with keys, in this order: match_score (0–100), summary. "
+    "Keep the summary under 80 words."
+)
+PROFILE_INSTRUCTIONS = (
+    "Extract a compact candidate profile from the resume in the user message. "
+    "Return JSON with keys: titles (list of job titles held), years_experience (number), "
+    "skills (list), tools (list), domains (list), education (list). "
+    "Use short phrases and no commentary."
+)
+
+# Batch analysis limits (see analyze_resume_matches)
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", 8))
+RPM_LIMIT = float(os.getenv("OPENAI_RPM_LIMIT", 500))
+TPM_LIMIT = float(os.getenv("OPENAI_TPM_LIMIT", 200_000))
+MAX_RETRIES = 5
+
+# Persistent analysis cache (ANALYSIS_CACHE_MAX_MB=0 disables)
+ANALYSIS_CACHE_MAX_MB = float(os.getenv("ANALYSIS_CACHE_MAX_MB", 20))
+
+_cache = None
+_cache_lock = threading.Lock()
+log = logging.getLogger(__name__)
+
+
+def _api_key() -> str:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("⚠️ Missing OPENAI_API_KEY in .env file")
-    client = OpenAI(api_key=api_key)
+    return api_key
+
+
+@lru_cache(maxsize=None)
+def get_client(base_url: str = None):
+    """
+    Shared OpenAI client, built on first use. The openai package is only
+    imported here, and a missing key is reported when analysis is actually
+    requested rather than at import time.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=_api_key(), base_url=base_url)
+
+
+def _async_client(base_url: str = None):
+    # Not cached: an AsyncOpenAI client belongs to the event loop it was used on.
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=_api_key(), base_url=base_url, max_retries=0)
+
+
+def get_analysis_cache():
+    """Shared analysis cache, created on first use (None when disabled)."""
+    global _cache
+    if ANALYSIS_CACHE_MAX_MB <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = SQLiteCache(
+                    default_cache_path(),
+                    table="match_analyses",
+                    max_bytes=int(ANALYSIS_CACHE_MAX_MB * 1024 * 1024),
+                )
+            except Exception as e:
+                print(f"Analysis cache unavailable: {e}")
+                _cache = False
+    return _cache if _cache is not False else None
+
+
+def _sha256(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def analysis_cache_key(resume_text: str, job_text: str, model: str = MODEL,
+                       temperature: float = TEMPERATURE, mode: str = "full") -> str:
+    """Content hash of everything that determines the model's answer (pass the compacted texts)."""
+    return _sha256(PROMPT_VERSION, mode, model, repr(float(temperature)), resume_text, job_text)
+
+
+def profile_cache_key(resume_text: str, model: str = MODEL) -> str:
+    return "profile:" + _sha256(PROMPT_VERSION, model, resume_text)
+
+
+# Message builders take texts already fitted to their token budgets (see _messages_for).
+def _match_messages(resume_text: str, job_text: str) -> list:
+    return [
+        {"role": "system", "content": MATCH_INSTRUCTIONS},
+        {"role": "user", "content": (
+            f"RESUME:\n{resume_text}\n\n"
+            f"JOB DESCRIPTION:\n{job_text}"
+        )},
+    ]
+
+
+def _profile_json(profile: dict) -> str:
+    """Canonical serialization so the same profile is always the same bytes."""
+    return json.dumps(profile, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _profile_match_messages(profile: dict, job_text: str) -> list:
+    # Instructions + profile form the shared prefix; only the job text varies.
+    return [
+        {"role": "system", "content": PROFILE_MATCH_INSTRUCTIONS},
+        {"role": "user", "content": (
+            f"CANDIDATE PROFILE:\n{_profile_json(profile)}\n\n"
+            f"JOB DESCRIPTION:\n{job_text}"
+        )},
+    ]
+
+
+def _profile_request_messages(resume_text: str) -> list:
+    return [
+        {"role": "system", "content": PROFILE_INSTRUCTIONS},
+        {"role": "user", "content": f"RESUME:\n{compact_resume_text(resume_text).text}"},
+    ]
+
+
+def _skills_note(skills: dict) -> str:
+    return (f"\n\nMATCHED SKILLS: {', '.join(skills['matched_skills']) or 'none'}"
+            f"\nMISSING SKILLS: {', '.join(skills['missing_skills']) or 'none'}")
+
+
+def _messages_for(resume_text: str, job_text: str, profile: dict = None):
+    """
+    (messages, cache key) for a full-resume or profile-based comparison.
+
+    Both texts are compacted to their token budgets (boilerplate dropped,
+    requirements kept first) instead of being sliced at a character count.
+    With LOCAL_SKILLS the locally matched skills are appended and the model
+    is only asked for a score and summary.
+    """
+    compact_job = compact_job_text(job_text).text
+    if profile:
+        mode, body = "profile", _profile_match_messages(profile, compact_job)
+        key_text = _profile_json(profile)
+    else:
+        key_text = compact_resume_text(resume_text).text
+        mode, body = "full", _match_messages(key_text, compact_job)
+    if LOCAL_SKILLS:
+        note = _skills_note(match_skills(resume_text, job_text))
+        body = [{"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {"role": "user", "content": body[1]["content"] + note}]
+        mode += "+skills"
+    return body, analysis_cache_key(key_text, compact_job, mode=mode)
+
+
+def _answer_max_tokens() -> int:
+    return SUMMARY_MAX_TOKENS if LOCAL_SKILLS else MAX_TOKENS
+
+
+def _answer_model():
+    return SummaryResult if LOCAL_SKILLS else MatchResult
+
+
+def _format_kwargs(model) -> dict:
+    """Extra chat.completions arguments that pin the answer to `model`'s JSON schema."""
+    return {"response_format": response_format(model)} if STRUCTURED_OUTPUT else {}
+
+
+def _record_usage(response):
+    """Token counts from response.usage (some OpenAI-compatible servers omit it)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    tracing.count("prompt_tokens", usage.prompt_tokens or 0, model=MODEL)
+    tracing.count("completion_tokens", usage.completion_tokens or 0, model=MODEL)
+    details = getattr(usage, "prompt_tokens_details", None)
+    tracing.count("cached_prompt_tokens", getattr(details, "cached_tokens", 0) or 0, model=MODEL)
+
+
+def _with_skills(result: dict, resume_text: str, job_text: str) -> dict:
+    """Fill in matched/missing skills from the local matcher when the model didn't return them."""
+    if "matched_skills" in result and "missing_skills" in result:
+        return result
+    local = match_skills(resume_text, job_text)
+    return {
+        "match_score": result.get("match_score", local["match_score"]),
+        "matched_skills": local["matched_skills"],
+        "missing_skills": local["missing_skills"],
+        "summary": result.get("summary", ""),
+    }
+
+
+def offline_match(resume_text: str, job_text: str) -> dict:
+    """Analysis without any API call: local skill matching and a templated summary."""
+    with tracing.span("analyze.offline"):
+        result = match_skills(resume_text, job_text)
+    total = len(result["matched_skills"]) + len(result["missing_skills"])
+    if total:
+        result["summary"] = (f"Offline analysis: the resume mentions {len(result['matched_skills'])} of the "
+                             f"{total} skills found in the job description.")
+    else:
+        result["summary"] = "Offline analysis: no known skills were found in the job description."
+    return result
+
+
+def _parse_result(text: str, model=None):
+    """
+    Validate the model's JSON answer against `model` (the answer schema by
+    default); returns (result, ok). Code fences and surrounding prose are
+    tolerated, so only a genuinely unusable answer comes back not ok.
+    """
+    result = parse_answer(text, model or _answer_model())
+    if result is None:
+        tracing.count("fallbacks", path="unparsed_answer")
+        return {"summary": (text or "").strip(), "match_score": 0}, False
+    return result, True
+
+
+def extract_resume_profile(resume_text: str, use_cache: bool = True):
+    """
+    Condense a resume into a structured profile (titles, years, skills, tools…).
+
+    Done once per resume and cached by its hash, so scoring many jobs only
+    sends this compact profile instead of the full resume every time.
+    Returns None if the model's answer could not be parsed.
+    """
+    if USE_MOCK:
+        return None
+    cache = get_analysis_cache()
+    key = profile_cache_key(resume_text)
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count("cache_hits", cache="profile")
+            return json.loads(cached)
 
+    with tracing.span("analyze.profile"):
+        response = get_client().chat.completions.create(
+            model=MODEL,
+            messages=_profile_request_messages(resume_text),
+            temperature=0,
+            max_tokens=PROFILE_MAX_TOKENS,
+            **_format_kwargs(ResumeProfile)
+        )
+    _record_usage(response)
+    profile, ok = _parse_result(response.choices[0].message.content, ResumeProfile)
+    if not ok:
+        return None
+    if cache is not None:
+        cache.set(key, json.dumps(profile))
+    return profile
 
-def analyze_resume_match(resume_text: str, job_text: str):
-    """Analyze how well a resume matches a job description."""
+
+def analyze_resume_match(resume_text: str, job_text: str, use_cache: bool = True, profile: dict = None):
+    """
+    Analyze how well a resume matches a job description.
+
+    Pass `profile` (from extract_resume_profile) to compare against the
+    compact profile instead of the full resume text.
+    Successful analyses are cached by content hash; pass use_cache=False to
+    force a fresh model call (the new result still replaces the cached one).
+    """
     if USE_MOCK:
         # fallback for classmates/instructors without API keys
-        return {
-            "match_score": 75,
-            "matched_skills": ["UX Research", "Prototyping", "Figma"],
-            "missing_skills": ["WCAG", "Design Systems"],
-            "summary": "Mock analysis — replace with real OpenAI key for live scoring."
-        }
-
-    prompt = f"""
-    You are an assistant evaluating job fit.
-    Compare this RESUME and JOB DESCRIPTION.
-    Return JSON with keys: match_score (0–100), matched_skills, missing_skills, summary.
-
-    RESUME:
-    {resume_text[:4000]}
-
-    JOB DESCRIPTION:
-    {job_text[:4000]}
-    """
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-        max_tokens=400
+        return offline_match(resume_text, job_text)
+
+    messages, key = _messages_for(resume_text, job_text, profile)
+    cache = get_analysis_cache()
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count("cache_hits", cache="analysis")
+            return json.loads(cached)
+
+    with tracing.span("analyze.request", mode="sync"):
+        response = get_client().chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=TEMPERATURE,
+            max_tokens=_answer_max_tokens(),
+            **_format_kwargs(_answer_model())
+        )
+    _record_usage(response)
+
+    result, ok = _parse_result(response.choices[0].message.content)
+    if ok:
+        result = _with_skills(result, resume_text, job_text)
+    if ok and cache is not None:
+        cache.set(key, json.dumps(result))
+    return result
+
+
+# =========================
+# STREAMING ANALYSIS
+# =========================
+
+_FIELD_RE = re.compile(r'"(match_score|matched_skills|missing_skills|summary)"\s*:\s*')
+_decoder = json.JSONDecoder()
+
+
+def _partial_string(raw: str) -> str:
+    """Decode the body of a JSON string whose closing quote hasn't arrived yet."""
+    for cut in range(min(len(raw), 6) + 1):  # drop a trailing half-escape like \u00
+        try:
+            return json.loads('"' + raw[:len(raw) - cut] + '"')
+        except ValueError:
+            continue
+    return ""
+
+
+def _partial_result(buffer: str) -> dict:
+    """
+    Fields that can already be read from an incomplete JSON answer.
+
+    A value counts as complete once something follows it (so "8" is not
+    mistaken for the final score while "85" is still arriving); the summary
+    is also returned while it is still being written.
+    """
+    out = {}
+    for m in _FIELD_RE.finditer(buffer):
+        key, pos = m.group(1), m.end()
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+            if end < len(buffer):
+                out[key] = _to_score(value) if key == "match_score" else value
+                continue
+        except (ValueError, TypeError):
+            pass
+        if key == "summary" and buffer[pos:pos + 1] == '"':
+            out[key] = _partial_string(buffer[pos + 1:])
+    return out
+
+
+def stream_resume_match(resume_text: str, job_text: str, use_cache: bool = True, profile: dict = None):
+    """
+    Like analyze_resume_match, but yields partial result dicts as tokens arrive.
+
+    match_score and the skill lists appear as soon as each JSON field is
+    complete; summary grows progressively. The last dict yielded is the final
+    (parsed, cached) result.
+    """
+    if USE_MOCK:
+        yield offline_match(resume_text, job_text)
+        return
+
+    messages, key = _messages_for(resume_text, job_text, profile)
+    cache = get_analysis_cache()
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count("cache_hits", cache="analysis")
+            yield json.loads(cached)
+            return
+
+    # Timed with tracing.record rather than a span: a `with` block can't stay open across yields.
+    start = time.perf_counter_ns()
+    stream = get_client().chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=TEMPERATURE,
+        max_tokens=_answer_max_tokens(),
+        stream=True,
+        # the final chunk then carries usage (and no choices)
+        **({"stream_options": {"include_usage": True}} if tracing.enabled() else {}),
+        **_format_kwargs(_answer_model())
     )
+    buffer = ""
+    last = None
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            _record_usage(chunk)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if not buffer:
+            tracing.record("analyze.first_token", start)
+        buffer += delta
+        partial = _partial_result(buffer)
+        if partial and partial != last:
+            last = partial
+            yield partial
+
+    tracing.record("analyze.request", start, mode="stream")
+    result, ok = _parse_result(buffer)
+    if ok:
+        result = _with_skills(result, resume_text, job_text)
+    if ok and cache is not None:
+        cache.set(key, json.dumps(result))
+    yield result
 
-    text = response.choices[0].message.content.strip()
+
+# =========================
+# BATCH (ASYNC) ANALYSIS
+# =========================
+
+def _retry_delay(err, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if the server sent one, else jittered backoff."""
+    response = getattr(err, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
     try:
-        return json.loads(text)
-    except Exception:
-        return {"summary": text, "match_score": 0}
\ No newline at end of file
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return min(30.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+async def _complete_async(aclient, messages, max_tokens, temperature, sem, rpm, tpm, answer_model):
+    """One chat completion under the batch limits; returns (text, error)."""
+    from openai import APIStatusError, APIConnectionError
+    est_tokens = sum(count_tokens(m["content"]) for m in messages) + max_tokens
+    async with sem:
+        for attempt in range(MAX_RETRIES + 1):
+            await rpm.acquire(1)
+            await tpm.acquire(est_tokens)
+            try:
+                with tracing.span("analyze.request", mode="batch", schema=answer_model.__name__):
+                    response = await aclient.chat.completions.create(
+                        model=MODEL,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **_format_kwargs(answer_model),
+                    )
+                _record_usage(response)
+                return response.choices[0].message.content, None
+            except (APIStatusError, APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt == MAX_RETRIES:
+                    return None, str(e)
+                tracing.count("retries", status=status or "connection")
+                await asyncio.sleep(_retry_delay(e, attempt))
+
+
+async def _extract_profile_async(aclient, resume_text, sem, rpm, tpm, use_cache):
+    cache = get_analysis_cache()
+    key = profile_cache_key(resume_text)
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count("cache_hits", cache="profile")
+            return json.loads(cached)
+    text, error = await _complete_async(aclient, _profile_request_messages(resume_text),
+                                        PROFILE_MAX_TOKENS, 0, sem, rpm, tpm, ResumeProfile)
+    profile, ok = _parse_result(text, ResumeProfile)
+    if error or not ok:
+        return None
+    if cache is not None:
+        cache.set(key, json.dumps(profile))
+    return profile
+
+
+async def _analyze_one_async(aclient, resume_text, job_text, profile, sem, rpm, tpm, use_cache):
+    messages, key = _messages_for(resume_text, job_text, profile)
+    cache = get_analysis_cache()
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count("cache_hits", cache="analysis")
+            return json.loads(cached)
+
+    text, error = await _complete_async(aclient, messages, _answer_max_tokens(), TEMPERATURE,
+                                        sem, rpm, tpm, _answer_model())
+    if error:
+        return {"error": error}
+    result, ok = _parse_result(text)
+    if ok:
+        result = _with_skills(result, resume_text, job_text)
+    if ok and cache is not None:
+        cache.set(key, json.dumps(result))
+    return result
+
+
+async def iter_resume_matches(resume_text: str, job_texts, max_concurrency: int = MAX_CONCURRENCY,
+                              rpm_limit: float = RPM_LIMIT, tpm_limit: float = TPM_LIMIT,
+                              base_url: str = None, use_cache: bool = True, two_stage: bool = True):
+    """
+    Async generator yielding (index, result) for each job as its analysis completes.
+
+    With two_stage=True the resume is first condensed into a cached profile
+    (see extract_resume_profile) and each job is compared against that, which
+    cuts input tokens per job; if profile extraction fails it falls back to
+    sending the full resume.
+
+    Calls run concurrently, capped by `max_concurrency` and by requests- and
+    tokens-per-minute token buckets. 429s and 5xx responses are retried with
+    backoff (honoring Retry-After). A job that still fails yields {"error": ...}.
+    `base_url` points the client at another OpenAI-compatible server (e.g. a local stub).
+    """
+    job_texts = list(job_texts)
+    if USE_MOCK:
+        for i in range(len(job_texts)):
+            yield i, offline_match(resume_text, job_texts[i])
+        return
+
+    aclient = _async_client(base_url)
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    rpm = AsyncTokenBucket(rpm_limit)
+    tpm = AsyncTokenBucket(tpm_limit)
+
+    tasks = []
+    try:
+        profile = None
+        if two_stage and job_texts:
+            profile = await _extract_profile_async(aclient, resume_text, sem, rpm, tpm, use_cache)
+
+        async def run(i, job_text):
+            return i, await _analyze_one_async(aclient, resume_text, job_text, profile,
+                                               sem, rpm, tpm, use_cache)
+
+        tasks = [asyncio.create_task(run(i, jt)) for i, jt in enumerate(job_texts)]
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+        await aclient.close()
+
+
+class MatchResults(list):
+    """analyze_resume_matches() results in input order; `dedupe` is the dedupe_report() of the texts."""
+
+    def __init__(self, results, dedupe: dict):
+        super().__init__(results)
+        self.dedupe = dedupe
+
+
+def analyze_resume_matches(resume_text: str, job_texts, on_result=None,
+                           dedupe_threshold: float = DEDUPE_THRESHOLD, **kwargs) -> MatchResults:
+    """
+    Analyze one resume against many job descriptions concurrently.
+
+    Returns results in the same order as `job_texts`. `on_result(index, result)`
+    is called as each one completes, for progress display. Near-duplicate
+    descriptions (reposts, multi-location listings) are analyzed once and
+    share the result, counted in the returned list's `dedupe` report; set
+    dedupe_threshold=0 to analyze every text. Other keyword arguments are
+    passed to iter_resume_matches().
+    """
+    job_texts = list(job_texts)
+    reps = group_texts(job_texts, threshold=dedupe_threshold)
+    unique = sorted(set(reps))
+    members = {}
+    for i, rep in enumerate(reps):
+        members.setdefault(rep, []).append(i)
+    report = dedupe_report(reps)
+    if report["calls_saved"]:
+        tracing.count("dedupe_skipped", report["calls_saved"], stage="analyze")
+        log.info("Reusing analyses for %d near-duplicate posting(s) of %d.",
+                 report["calls_saved"], report["postings"])
+
+    async def collect():
+        results = [None] * len(job_texts)
+        async for u, result in iter_resume_matches(resume_text, [job_texts[i] for i in unique], **kwargs):
+            for i in members[unique[u]]:
+                results[i] = result
+                if on_result:
+                    on_result(i, result)
+        return results
+
+    return MatchResults(asyncio.run(collect()), report)
@@ -1,30 +1,158 @@
 # resume_reader.py
+import io
 import os
-from PyPDF2 import PdfReader
-from docx import Document
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+import tracing
+from cache_store import SQLiteCache, default_cache_path
 
-def read_resume_text(file_path: str) -> str:
-    """Extract text from PDF, DOCX, or TXT resume files."""
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+SUPPORTED_TYPES = (".pdf", ".docx", ".txt")
+
+# Extracted text is cached by SHA-256 of the file bytes: an in-memory LRU
+# (shared by every session of a Streamlit server) in front of an optional
+# on-disk layer, enabled with RESUME_DISK_CACHE=true.
+MEMORY_CACHE_SIZE = int(os.getenv("RESUME_MEMORY_CACHE_SIZE", 64))
+RESUME_DISK_CACHE = os.getenv("RESUME_DISK_CACHE", "false").lower() == "true"
+
+# PDFs with at least this many pages are split across a shared process pool
+# (parallel=None); PDF_WORKERS is the pool size.
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 12))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", min(os.cpu_count() or 1, 4)))
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_disk = None
+
+
+def _disk_cache():
+    global _disk
+    if not RESUME_DISK_CACHE:
+        return None
+    with _memory_lock:
+        if _disk is None:
+            try:
+                _disk = SQLiteCache(default_cache_path(), table="resume_texts", max_bytes=50 * 1024 * 1024)
+            except Exception as e:
+                print(f"Resume disk cache unavailable: {e}")
+                _disk = False
+    return _disk if _disk is not False else None
+
+
+def _remember(key: str, text: str):
+    with _memory_lock:
+        _memory[key] = text
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+# One process pool for the life of the process, started on the first large PDF.
+# Workers are spawned, not forked: forking a threaded server (Streamlit) can
+# copy a lock some other thread holds and deadlock the child.
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pdf_pool
+
+
+# Worker-process state: the last few parsed PDFs, so each worker parses a file once.
+_worker_readers = OrderedDict()
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list:
+    """Text of pages [start, stop) of the PDF at `path` (a temp copy written once per parse)."""
+    reader = _worker_readers.get(path)
+    if reader is None:
+        from PyPDF2 import PdfReader
+        reader = _worker_readers[path] = PdfReader(path)  # reads the whole file into memory
+        while len(_worker_readers) > 2:
+            _worker_readers.popitem(last=False)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _over_budget(total_chars: int, max_chars: int) -> bool:
+    return max_chars is not None and total_chars >= max_chars
 
-    ext = os.path.splitext(file_path)[1].lower()
 
+def _parse_pdf(data: bytes, max_pages: int = None, max_chars: int = None, parallel: bool = None) -> str:
+    """
+    Extract PDF text page by page, joined once at the end.
+
+    Stops early after `max_pages` pages or once `max_chars` characters exist.
+    parallel=None uses a process pool only for PDFs of PARALLEL_MIN_PAGES+
+    pages; True/False force it on or off.
+    """
+    from PyPDF2 import PdfReader  # parser libraries load on first use, not at startup
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+    auto = parallel is None
+    if auto:
+        parallel = n_pages >= PARALLEL_MIN_PAGES
+    workers = min(PDF_WORKERS, n_pages)
+
+    pages = []
+    total = 0
+    # Sequential pass: everything when not parallel; with a char budget in
+    # auto mode, the first pages too, since they are often all we need.
+    seq_stop = n_pages if not parallel or workers < 2 else (
+        min(PARALLEL_MIN_PAGES, n_pages) if auto and max_chars is not None else 0)
+    for i in range(seq_stop):
+        pages.append(reader.pages[i].extract_text() or "")
+        total += len(pages[-1]) + 1
+        if _over_budget(total, max_chars):
+            return "\n".join(pages).strip()
+    if seq_stop >= n_pages:
+        return "\n".join(pages).strip()
+
+    # Small in-order chunks so a char budget can stop the pool early. The bytes
+    # go to the workers once, as a temp file; each task carries only its pages.
+    chunk = max(1, (n_pages - seq_stop) // (workers * 4))
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=".pdf")
+    futures = []
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        pool = _get_pdf_pool()
+        futures = [pool.submit(_extract_page_range, path, a, min(a + chunk, n_pages))
+                   for a in range(seq_stop, n_pages, chunk)]
+        for fut in futures:
+            for text in fut.result():
+                pages.append(text)
+                total += len(text) + 1
+            if _over_budget(total, max_chars):
+                break
+    finally:
+        for fut in futures:
+            fut.cancel()
+        wait(futures)  # chunks already running may still need to open the file
+        os.remove(path)
+    return "\n".join(pages).strip()
+
+
+def _parse(data: bytes, ext: str, max_pages: int = None, max_chars: int = None, parallel: bool = None) -> str:
+    """Extract text from the raw bytes of a PDF, DOCX, or TXT file."""
     if ext == ".pdf":
-        text = ""
         try:
-            with open(file_path, "rb") as f:
-                reader = PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
+            return _parse_pdf(data, max_pages=max_pages, max_chars=max_chars, parallel=parallel)
         except Exception as e:
             raise ValueError(f"Error reading PDF: {e}")
-        return text.strip()
 
     elif ext == ".docx":
-        text = ""
         try:
-            doc = Document(file_path)
+            from docx import Document
+            doc = Document(io.BytesIO(data))
             text = "\n".join([para.text for para in doc.paragraphs])
         except Exception as e:
             raise ValueError(f"Error reading DOCX: {e}")
@@ -32,10 +160,61 @@ def read_resume_text(file_path: str) -> str:
 
     elif ext == ".txt":
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read().strip()
+            return data.decode("utf-8").strip()
         except Exception as e:
             raise ValueError(f"Error reading TXT: {e}")
 
     else:
-        raise ValueError("Unsupported file type. Please use PDF, DOCX, or TXT.")
\ No newline at end of file
+        raise ValueError("Unsupported file type. Please use PDF, DOCX, or TXT.")
+
+
+def extract_resume_bytes(data: bytes, filename: str, max_pages: int = None,
+                         max_chars: int = None, parallel: bool = None) -> str:
+    """
+    Extract resume text from file bytes (e.g. a Streamlit upload).
+
+    `filename` only supplies the extension. Each distinct file content is
+    parsed once; later calls with the same bytes come from the cache.
+    For PDFs, `max_pages` / `max_chars` stop extraction early (e.g. at the
+    analyzer's input limit) and `parallel` controls page-level multiprocessing.
+    """
+    ext = os.path.splitext(filename)[1].lower() if "." in filename else filename.lower()
+    if ext not in SUPPORTED_TYPES:
+        raise ValueError("Unsupported file type. Please use PDF, DOCX, or TXT.")
+
+    key = f"{hashlib.sha256(data).hexdigest()}{ext}:{max_pages}:{max_chars}"
+    with _memory_lock:
+        text = _memory.get(key)
+        if text is not None:
+            _memory.move_to_end(key)
+            tracing.count("cache_hits", cache="resume")
+            return text
+
+    disk = _disk_cache()
+    text = disk.get(key) if disk is not None else None
+    if text is not None:
+        tracing.count("cache_hits", cache="resume_disk")
+    else:
+        tracing.count("cache_misses", cache="resume")
+        with tracing.span("extract.resume", format=ext, bytes=len(data)):
+            text = _parse(data, ext, max_pages=max_pages, max_chars=max_chars, parallel=parallel)
+        if disk is not None:
+            disk.set(key, text)
+    _remember(key, text)
+    return text
+
+
+def read_resume_text(file_path: str, max_pages: int = None, max_chars: int = None,
+                     parallel: bool = None) -> str:
+    """Extract text from PDF, DOCX, or TXT resume files (see extract_resume_bytes for options)."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in SUPPORTED_TYPES:
+        raise ValueError("Unsupported file type. Please use PDF, DOCX, or TXT.")
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+    return extract_resume_bytes(data, file_path, max_pages=max_pages, max_chars=max_chars,
+                                parallel=parallel)
@@ -0,0 +1,221 @@
+# saved_search.py — incremental (new/changed only) job searches
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import pandas as pd
+from cache_store import default_cache_path
+from job_urls import linkedin_job_id
+from job_spy import get_jobs, fill_descriptions
+
+# Fields that define "the same posting", hashed once the description is fetched;
+# volatile columns (e.g. date scraped) are ignored.
+HASH_FIELDS = ("title", "company", "location", "description")
+
+
+def search_key(search_term: str, location: str) -> str:
+    return f"{(search_term or '').strip().lower()}|{(location or '').strip().lower()}"
+
+
+def job_key(job_url: str) -> str:
+    """Stable posting ID: the LinkedIn job ID when present, else the URL itself."""
+    return linkedin_job_id(job_url or "") or (job_url or "")
+
+
+def resume_hash(resume_text: str) -> str:
+    """Key for analyses of one resume (its extracted text)."""
+    return hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+
+
+def content_hash(row) -> str:
+    h = hashlib.sha256()
+    for field in HASH_FIELDS:
+        value = row.get(field)
+        h.update(str(value if isinstance(value, str) else "").strip().encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SavedSearchStore:
+    """
+    SQLite record of the postings (ID + content hash) seen for each saved
+    search, and of their analyses per resume and posting version.
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or default_cache_path("saved_searches.sqlite3"),
+                                     check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_jobs ("
+            " search TEXT NOT NULL,"
+            " job_key TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " job_url TEXT,"
+            " description TEXT,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " PRIMARY KEY (search, job_key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " search TEXT NOT NULL,"
+            " job_key TEXT NOT NULL,"
+            " resume_hash TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " analysis TEXT NOT NULL,"
+            " analyzed REAL NOT NULL,"
+            " PRIMARY KEY (search, job_key, resume_hash))"
+        )
+
+    def known_hashes(self, search: str, keys: list) -> dict:
+        """{job_key: content_hash} for the given keys already seen under `search`."""
+        if not keys:
+            return {}
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_key, content_hash FROM seen_jobs WHERE search = ? AND job_key IN ({marks})",
+                [search, *keys],
+            ).fetchall()
+        return dict(rows)
+
+    def analyzed(self, search: str, resume_hash: str, keys: list) -> set:
+        """The keys whose current version already has an analysis for the resume."""
+        if not keys:
+            return set()
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.job_key FROM analyses a JOIN seen_jobs s"
+                " ON s.search = a.search AND s.job_key = a.job_key AND s.content_hash = a.content_hash"
+                f" WHERE a.search = ? AND a.resume_hash = ? AND a.job_key IN ({marks})",
+                [search, resume_hash, *keys],
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def touch(self, search: str, keys: list):
+        """Update last_seen for postings that are still listed but unchanged."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE seen_jobs SET last_seen = ? WHERE search = ? AND job_key = ?",
+                [(now, search, k) for k in keys],
+            )
+
+    def record(self, search: str, key: str, chash: str, job_url: str = "", description: str = ""):
+        """Store a new or changed posting; a changed posting loses its old analyses."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO seen_jobs (search, job_key, content_hash, job_url, description, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (search, job_key) DO UPDATE SET"
+                "  content_hash = excluded.content_hash, job_url = excluded.job_url,"
+                "  description = excluded.description, last_seen = excluded.last_seen",
+                (search, key, chash, job_url, description, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM analyses WHERE search = ? AND job_key = ? AND content_hash != ?",
+                (search, key, chash),
+            )
+
+    def record_analysis(self, search: str, key: str, resume_hash: str, result: dict):
+        """Store the resume's analysis of the posting's current version."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses"
+                " (search, job_key, resume_hash, content_hash, analysis, analyzed)"
+                " SELECT search, job_key, ?, content_hash, ?, ? FROM seen_jobs WHERE search = ? AND job_key = ?",
+                (resume_hash, json.dumps(result), time.time(), search, key),
+            )
+
+    def postings(self, search: str, resume_hash: str = None) -> pd.DataFrame:
+        """
+        Everything remembered for a saved search, newest first; `analysis` is
+        the given resume's analysis of the current version (else empty).
+        """
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT s.job_key, s.job_url, s.description, a.analysis, s.first_seen, s.last_seen"
+                " FROM seen_jobs s LEFT JOIN analyses a"
+                "  ON a.search = s.search AND a.job_key = s.job_key"
+                "  AND a.content_hash = s.content_hash AND a.resume_hash = ?"
+                " WHERE s.search = ? ORDER BY s.first_seen DESC",
+                self._conn, params=(resume_hash or "", search),
+            )
+
+    def searches(self) -> list:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT search FROM seen_jobs")]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SavedSearchStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SavedSearchStore()
+        return _store
+
+
+def incremental_search(search_term: str, location: str, num_results: int = 25,
+                       fetch_descriptions: bool = True, store: SavedSearchStore = None,
+                       resume_hash: str = None) -> pd.DataFrame:
+    """
+    Run a saved search and return only postings that are new or changed since the last run.
+
+    Search results carry no description, so every listed posting is fetched
+    first (the description and HTTP revalidation caches keep unchanged ones
+    cheap) and hashed with it: an edited description counts as a change.
+    With `resume_hash`, postings seen before but not yet analyzed for that
+    resume come back too. The result has the usual get_jobs columns plus
+    `job_key` and `change` ("new", "changed" or "pending").
+
+    A posting whose description can't be fetched is not recorded, so the
+    next run tries it again instead of storing it blank.
+    """
+    store = store or get_store()
+    key = search_key(search_term, location)
+    df = get_jobs(search_term, location, num_results=num_results)
+    if df.empty:
+        return df.assign(job_key=[], change=[])
+
+    df = df.copy()
+    df["job_key"] = df["job_url"].map(job_key)
+    df = df.drop_duplicates("job_key")
+    if fetch_descriptions:
+        df = fill_descriptions(df)
+        missing = df["description"].fillna("").astype(str).str.strip() == ""
+    else:
+        missing = pd.Series(False, index=df.index)
+    hashes = df.apply(content_hash, axis=1)
+    known = store.known_hashes(key, df["job_key"].tolist())
+    previous = df["job_key"].map(known)
+    df["change"] = previous.map(lambda h: "new" if not isinstance(h, str) else "changed")
+    fresh = previous.isna() | ((previous != hashes) & ~missing)
+    pending = pd.Series(False, index=df.index)
+    if resume_hash:
+        done = store.analyzed(key, resume_hash, df["job_key"].tolist())
+        pending = ~fresh & ~missing & ~df["job_key"].isin(done)
+        df.loc[pending, "change"] = "pending"
+
+    store.touch(key, df.loc[~fresh, "job_key"].tolist())
+    for (_, row), chash in zip(df[fresh & ~missing].iterrows(), hashes[fresh & ~missing]):
+        desc = row.get("description")
+        store.record(key, row["job_key"], chash, row.get("job_url") or "",
+                     desc if isinstance(desc, str) else "")
+    return df[fresh | pending].copy()
+
+
+def poll_saved_searches(searches, num_results: int = 25, store: SavedSearchStore = None) -> dict:
+    """Run several (search_term, location) saved searches; {(term, location): new/changed DataFrame}."""
+    return {
+        (term, loc): incremental_search(term, loc, num_results=num_results, store=store)
+        for term, loc in searches
+    }
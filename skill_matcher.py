@@ -0,0 +1,194 @@
+# skill_matcher.py — offline skill extraction with an Aho-Corasick automaton
+import os
+import json
+import threading
+from collections import deque
+
+# Canonical skill -> the phrases that count as a mention of it (matched
+# case-insensitively on word boundaries; the canonical name itself only
+# counts if listed, so short names like "Go" don't match everyday words).
+# Extend or override with a JSON file of the same shape via SKILL_TAXONOMY_PATH.
+SKILL_TAXONOMY = {
+    # Design & research
+    "UX Research": ["user research", "ux research", "usability research", "user interviews", "contextual inquiry"],
+    "Usability Testing": ["usability testing", "usability tests", "user testing", "a/b testing", "ab testing"],
+    "Prototyping": ["prototyping", "prototype", "prototypes", "clickable prototypes"],
+    "Wireframing": ["wireframing", "wireframe", "wireframes"],
+    "Interaction Design": ["interaction design", "ixd"],
+    "Visual Design": ["visual design", "ui design", "user interface design"],
+    "Information Architecture": ["information architecture"],
+    "Design Systems": ["design system", "design systems", "component library"],
+    "Journey Mapping": ["journey mapping", "journey maps", "customer journey", "user journeys"],
+    "Personas": ["personas", "persona"],
+    "Design Thinking": ["design thinking"],
+    "Accessibility": ["accessibility", "a11y", "wcag", "wcag 2.0", "wcag 2.1", "wcag 2.2", "section 508", "wai-aria"],
+    "Figma": ["figma", "figjam"],
+    "Sketch": ["sketch app", "sketch"],
+    "Adobe XD": ["adobe xd"],
+    "Adobe Creative Suite": ["adobe creative suite", "creative cloud", "photoshop", "illustrator", "indesign"],
+    "InVision": ["invision"],
+    "Miro": ["miro"],
+    "Motion Design": ["motion design", "after effects", "animation"],
+    "Heuristic Evaluation": ["heuristic evaluation", "heuristic review", "heuristics"],
+    "Survey Design": ["survey design", "surveys", "qualtrics"],
+    # Engineering
+    "Python": ["python"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript"],
+    "Java": ["java"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", ".net", "dotnet"],
+    "Go": ["golang"],
+    "Rust": ["rust"],
+    "SQL": ["sql", "postgresql", "postgres", "mysql", "sqlite", "t-sql"],
+    "HTML/CSS": ["html", "css", "html5", "css3", "sass", "scss"],
+    "React": ["react", "react.js", "reactjs", "react native"],
+    "Angular": ["angular", "angularjs"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node.js", "nodejs"],
+    "REST APIs": ["rest api", "rest apis", "restful", "api design"],
+    "GraphQL": ["graphql"],
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "lambda"],
+    "Azure": ["azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Docker": ["docker", "containers"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery", "github actions", "jenkins"],
+    "Git": ["git", "github", "gitlab", "version control"],
+    "Linux": ["linux", "unix", "bash"],
+    "Testing": ["unit testing", "test automation", "pytest", "jest", "selenium", "cypress"],
+    # Data
+    "Data Analysis": ["data analysis", "data analytics", "analytics"],
+    "Machine Learning": ["machine learning", "ml", "deep learning"],
+    "Statistics": ["statistics", "statistical analysis", "regression"],
+    "Pandas": ["pandas", "numpy"],
+    "Spark": ["spark", "pyspark"],
+    "Airflow": ["airflow"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["excel", "spreadsheets"],
+    "Google Analytics": ["google analytics", "ga4"],
+    # Product & collaboration
+    "Product Management": ["product management", "product manager", "roadmap", "roadmaps"],
+    "Agile": ["agile", "scrum", "kanban", "sprint"],
+    "Jira": ["jira", "confluence"],
+    "Stakeholder Management": ["stakeholder management", "stakeholders", "cross-functional"],
+    "Communication": ["communication skills", "presentation skills", "storytelling"],
+    "Leadership": ["leadership", "mentoring", "mentorship", "people management"],
+}
+
+_automaton = None
+_automaton_lock = threading.Lock()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "+#"
+
+
+class SkillAutomaton:
+    """
+    Aho-Corasick automaton over lowercase patterns.
+
+    Every pattern is found in one left-to-right pass over the text,
+    whatever the number of patterns. Matches must sit on word boundaries
+    (so "java" does not match inside "javascript").
+    """
+
+    def __init__(self, taxonomy: dict):
+        self._goto = [{}]      # state -> {char: state}; a full DFA after _build_links
+        self._out = [[]]       # state -> [(skill, pattern length)]
+        for skill, synonyms in taxonomy.items():
+            for pattern in {s.lower() for s in synonyms}:
+                self._add(pattern.strip(), skill)
+        self._build_links()
+
+    def _add(self, pattern: str, skill: str):
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._out.append([])
+            state = nxt
+        self._out[state].append((skill, len(pattern)))
+
+    def _build_links(self):
+        """Fill in failure links, then complete goto into a DFA so scanning never backtracks."""
+        fail = [0] * len(self._goto)
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in self._goto[f]:
+                    f = fail[f]
+                fail[nxt] = self._goto[f].get(ch, 0) if state else 0
+                self._out[nxt] = self._out[nxt] + self._out[fail[nxt]]
+        # BFS order guarantees a state's failure target is completed before it is.
+        for state in order:
+            inherited = self._goto[fail[state]]
+            own = self._goto[state]
+            self._goto[state] = {**inherited, **own}
+
+    def find(self, text: str) -> dict:
+        """{canonical skill: first match position} for every skill mentioned in `text`."""
+        text = (text or "").lower()
+        goto, out = self._goto, self._out
+        found = {}
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            if i + 1 < n and _is_word_char(text[i + 1]):
+                continue
+            for skill, length in out[state]:
+                start = i - length + 1
+                if skill not in found and (start == 0 or not _is_word_char(text[start - 1])):
+                    found[skill] = start
+        return found
+
+
+def _load_taxonomy() -> dict:
+    taxonomy = dict(SKILL_TAXONOMY)
+    path = os.getenv("SKILL_TAXONOMY_PATH")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            taxonomy.update(json.load(f))
+    return taxonomy
+
+
+def get_automaton() -> SkillAutomaton:
+    """Process-wide automaton, compiled from the taxonomy on first use."""
+    global _automaton
+    with _automaton_lock:
+        if _automaton is None:
+            _automaton = SkillAutomaton(_load_taxonomy())
+        return _automaton
+
+
+def find_skills(text: str) -> list:
+    """Canonical skills mentioned in `text`, in order of first mention."""
+    found = get_automaton().find(text)
+    return sorted(found, key=found.get)
+
+
+def match_skills(resume_text: str, job_text: str) -> dict:
+    """
+    Local, deterministic skill comparison: the job's skills split into those
+    the resume mentions and those it doesn't, plus the share matched (0–100).
+    """
+    job_skills = find_skills(job_text)
+    have = set(find_skills(resume_text))
+    matched = [s for s in job_skills if s in have]
+    missing = [s for s in job_skills if s not in have]
+    score = round(100 * len(matched) / len(job_skills)) if job_skills else 0
+    return {"match_score": score, "matched_skills": matched, "missing_skills": missing}
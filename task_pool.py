@@ -0,0 +1,162 @@
+# task_pool.py — server-wide background task pool (shared by all Streamlit sessions)
+import os
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", 8))
+TASK_TTL = float(os.getenv("TASK_TTL", 600))  # seconds a finished task stays retrievable
+
+
+class Task:
+    """
+    One submitted call. Worker code may call report() to publish progress
+    (done/total/message) and a `partial` value (e.g. the rows loaded so far);
+    pollers read the attributes without blocking.
+    """
+
+    def __init__(self, key: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.state = "queued"   # queued -> running -> done | failed
+        self.done_count = 0
+        self.total = None
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.trace = None       # tracing.Registry of the spans/counters recorded while it ran
+        self.submitted = time.time()
+        self.finished = None
+        self._event = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("done", "failed")
+
+    @property
+    def fraction(self) -> float:
+        """Progress in [0, 1], or 0 when the total is unknown."""
+        return min(1.0, self.done_count / self.total) if self.total else 0.0
+
+    def report(self, done: int = None, total: int = None, message: str = None, partial=None):
+        if done is not None:
+            self.done_count = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._event.wait(timeout)
+
+
+def task_key(fn, *args, **kwargs) -> str:
+    """Identity of a call: identical calls in flight at the same time share one task."""
+    h = hashlib.sha256(f"{fn.__module__}.{fn.__qualname__}".encode("utf-8"))
+    h.update(repr(args).encode("utf-8"))
+    h.update(repr(sorted(kwargs.items())).encode("utf-8"))
+    return h.hexdigest()
+
+
+class TaskPool:
+    """
+    Bounded thread pool with task IDs and in-flight deduplication.
+
+    submit() returns immediately with a task ID; a second submit of the
+    same call while the first is queued or running returns the first ID,
+    so concurrent sessions asking for the same search or analysis trigger
+    one fetch/LLM call. Finished tasks are kept for TASK_TTL seconds.
+    """
+
+    def __init__(self, max_workers: int = TASK_WORKERS, ttl: float = TASK_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resumesync-task")
+        self._max_workers = max_workers
+        self._tasks = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, key: str = None, pass_task: bool = False, **kwargs) -> str:
+        """
+        Run fn(*args, **kwargs) in the pool and return the task ID.
+        With pass_task=True, the Task is passed as `task=` so fn can report progress.
+        """
+        key = key or task_key(fn, *args, **kwargs)
+        with self._lock:
+            self._purge()
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return existing.id
+            task = Task(key)
+            self._tasks[task.id] = task
+            self._inflight[key] = task
+        if pass_task:
+            kwargs["task"] = task
+        self._executor.submit(self._run, task, fn, args, kwargs)
+        return task.id
+
+    def _run(self, task: Task, fn, args, kwargs):
+        task.state = "running"
+        try:
+            with tracing.collect() as task.trace:
+                task.result = fn(*args, **kwargs)
+            task.state = "done"
+        except Exception as e:
+            task.error = f"{type(e).__name__}: {e}"
+            task.state = "failed"
+        finally:
+            task.finished = time.time()
+            with self._lock:
+                if self._inflight.get(task.key) is task:
+                    del self._inflight[task.key]
+            task._event.set()
+
+    def _purge(self):
+        cutoff = time.time() - self.ttl
+        for task_id in [t.id for t in self._tasks.values() if t.finished and t.finished < cutoff]:
+            del self._tasks[task_id]
+
+    def get(self, task_id: str):
+        """The Task for an ID, or None if unknown or expired."""
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def result(self, task_id: str, timeout: float = None):
+        """Block until the task finishes; returns its result or raises RuntimeError on failure."""
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        if not task.wait(timeout):
+            raise TimeoutError(task_id)
+        if task.state == "failed":
+            raise RuntimeError(task.error)
+        return task.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [t.state for t in self._tasks.values()]
+        return {
+            "workers": self._max_workers,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "finished": states.count("done") + states.count("failed"),
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_task_pool() -> TaskPool:
+    """Process-wide pool; in Streamlit every session of the server shares it."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = TaskPool()
+        return _pool
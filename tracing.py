@@ -0,0 +1,331 @@
+# tracing.py — lightweight spans and counters for the hot paths, exported as Prometheus text and JSON logs
+#
+#   TRACING=1 python main.py                          # collect in memory
+#   TRACING=1 TRACE_LOG=trace.jsonl python main.py    # plus one JSON line per span ("-" for stderr)
+#   TRACING=1 TRACE_PROM_FILE=resumesync.prom ...     # Prometheus text file, written at exit / flush()
+#   TRACING=1 TRACE_PROM_PORT=9464 streamlit run app.py   # plus GET /metrics
+#
+# Disabled (the default), span() returns a shared no-op and count() returns
+# immediately, so instrumented code pays one global lookup per call.
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
+
+TRACE_LOG = os.getenv("TRACE_LOG")            # JSON lines: a path, or "-" for stderr
+TRACE_PROM_FILE = os.getenv("TRACE_PROM_FILE")
+TRACE_PROM_PORT = int(os.getenv("TRACE_PROM_PORT", 0))
+METRIC_PREFIX = "resumesync"
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+
+_enabled = os.getenv("TRACING", "0").lower() in ("1", "true")
+_current = contextvars.ContextVar("tracing_span", default=None)
+_collectors = contextvars.ContextVar("tracing_collectors", default=())
+_log_lock = threading.Lock()
+_log_file = None
+_server = None
+
+
+class Registry:
+    """Span timings (count, total, max, histogram) and labeled counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = {}     # name -> [count, total_ns, max_ns, bucket counts...]
+        self.counters = {}  # (name, ((label, value), ...)) -> total
+
+    def add_span(self, name: str, ns: int):
+        seconds = ns / 1e9
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = [0, 0, 0] + [0] * len(BUCKETS)
+            stats[0] += 1
+            stats[1] += ns
+            stats[2] = max(stats[2], ns)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats[3 + i] += 1
+                    break
+
+    def add_count(self, key: tuple, value: float):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self) -> dict:
+        """{"spans": {name: {count, total_ms, mean_ms, max_ms}}, "counters": {"name{label=value}": total}}"""
+        with self._lock:
+            spans = {name: list(s) for name, s in self.spans.items()}
+            counters = dict(self.counters)
+        return {
+            "spans": {
+                name: {"count": s[0], "total_ms": round(s[1] / 1e6, 3),
+                       "mean_ms": round(s[1] / s[0] / 1e6, 3), "max_ms": round(s[2] / 1e6, 3)}
+                for name, s in sorted(spans.items())
+            },
+            "counters": {_series(name, labels): value for (name, labels), value in sorted(counters.items())},
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (spans as one histogram, counters as *_total)."""
+        with self._lock:
+            spans = {name: list(s) for name, s in self.spans.items()}
+            counters = dict(self.counters)
+        lines = []
+        if spans:
+            metric = f"{METRIC_PREFIX}_span_seconds"
+            lines += [f"# HELP {metric} Time spent in instrumented code paths.", f"# TYPE {metric} histogram"]
+            for name, s in sorted(spans.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, s[3:]):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {s[0]}')
+                lines.append(f'{metric}_sum{{span="{name}"}} {s[1] / 1e9:.6f}')
+                lines.append(f'{metric}_count{{span="{name}"}} {s[0]}')
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{_series(metric, labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+
+def _series(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in labels)
+    return name + "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+_registry = Registry()
+
+
+class Span:
+    """A timed block (perf_counter_ns). Counters recorded inside it are also attached to it."""
+    __slots__ = ("name", "attrs", "counts", "parent", "start_ns", "duration_ns", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+        self.counts = {}
+        self.parent = None
+        self.duration_ns = 0
+
+    def set(self, **attrs):
+        """Add attributes once known (e.g. source="cache")."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        _current.reset(self._token)
+        _finish(self, exc_type)
+        return False
+
+
+def _finish(s: Span, exc_type=None):
+    for registry in (_registry,) + _collectors.get():
+        registry.add_span(s.name, s.duration_ns)
+    if _log_file is not None:
+        _log(s, exc_type)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **attrs):
+    """`with span("fetch.guest", job_id=...):` — a no-op when tracing is off."""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def record(name: str, start_ns: int, **attrs):
+    """
+    Record a span that started at start_ns (time.perf_counter_ns()) and ends now,
+    for code that can't hold a `with` block open, such as a generator across yields.
+    """
+    if not _enabled:
+        return
+    s = Span(name, attrs)
+    s.parent = _current.get()
+    s.duration_ns = time.perf_counter_ns() - start_ns
+    _finish(s)
+
+
+def count(name: str, value: float = 1, **labels):
+    """Add to a counter (e.g. count("cache_hits", cache="description")); ignored when tracing is off."""
+    if not _enabled or not value:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    for registry in (_registry,) + _collectors.get():
+        registry.add_count(key, value)
+    current = _current.get()
+    if current is not None:
+        with _log_lock:
+            current.counts[name] = current.counts.get(name, 0) + value
+
+
+def bind(fn):
+    """
+    fn wrapped to run inside the caller's current span and collectors, for
+    handing work to another thread (contextvars don't follow ThreadPoolExecutor).
+    """
+    if not _enabled:
+        return fn
+    parent, collectors = _current.get(), _collectors.get()
+
+    def run(*args, **kwargs):
+        t_span, t_coll = _current.set(parent), _collectors.set(collectors)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _collectors.reset(t_coll)
+            _current.reset(t_span)
+    return run
+
+
+@contextmanager
+def collect():
+    """
+    Also record everything traced inside this block (and in work it hands off
+    through bind() or asyncio) into a fresh Registry, e.g. one Streamlit run.
+    """
+    registry = Registry()
+    if not _enabled:
+        yield registry
+        return
+    token = _collectors.set(_collectors.get() + (registry,))
+    try:
+        yield registry
+    finally:
+        _collectors.reset(token)
+
+
+def snapshot() -> dict:
+    """Process-wide totals since start (or the last reset())."""
+    return _registry.snapshot()
+
+
+def prometheus_text() -> str:
+    return _registry.prometheus()
+
+
+def reset():
+    _registry.reset()
+
+
+def _log(s: Span, exc_type):
+    record = {
+        "ts": round(time.time(), 3),
+        "span": s.name,
+        "ms": round(s.duration_ns / 1e6, 3),
+        "parent": s.parent.name if s.parent is not None else None,
+        "thread": threading.current_thread().name,
+    }
+    if s.attrs:
+        record["attrs"] = s.attrs
+    if s.counts:
+        record["counts"] = s.counts
+    if exc_type is not None:
+        record["error"] = exc_type.__name__
+    line = json.dumps(record, default=str)
+    with _log_lock:
+        _log_file.write(line + "\n")
+        _log_file.flush()
+
+
+def flush():
+    """Write the Prometheus file now (TRACE_PROM_FILE); it is also written at exit."""
+    if not (_enabled and TRACE_PROM_FILE):
+        return
+    tmp = f"{TRACE_PROM_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, TRACE_PROM_FILE)  # atomic, so a scraper never reads half a file
+
+
+def _serve_metrics(port: int):
+    """GET /metrics on 127.0.0.1:port from a daemon thread."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tracing-metrics", daemon=True).start()
+    return server
+
+
+def _start_exporters():
+    global _log_file, _server
+    with _log_lock:
+        if TRACE_LOG and _log_file is None:
+            _log_file = sys.stderr if TRACE_LOG == "-" else open(TRACE_LOG, "a", encoding="utf-8")
+    if TRACE_PROM_PORT and _server is None:
+        try:
+            _server = _serve_metrics(TRACE_PROM_PORT)
+        except OSError as e:  # e.g. another Streamlit worker already serves the port
+            print(f"Metrics endpoint unavailable on port {TRACE_PROM_PORT}: {e}")
+            _server = False
+
+
+def enable(on: bool = True):
+    """Turn tracing on or off at runtime (e.g. from the app's debug panel)."""
+    global _enabled
+    _enabled = on
+    if on:
+        _start_exporters()
+
+
+if _enabled:
+    _start_exporters()
+atexit.register(flush)
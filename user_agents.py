@@ -1,5 +1,6 @@
 # user_agents.py
 import random
+import threading
 
 _UAS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
@@ -8,11 +9,32 @@ _UAS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
 ]
 
-def get_random_headers() -> dict:
-    return {
-        "User-Agent": random.choice(_UAS),
+# One user agent per host, kept until that host throttles us (see rotate_user_agent).
+_host_uas = {}
+_host_uas_lock = threading.Lock()
+
+def user_agent_for(host: str) -> str:
+    with _host_uas_lock:
+        return _host_uas.setdefault(host, random.choice(_UAS))
+
+def rotate_user_agent(host: str) -> str:
+    """Switch `host` to a different user agent (called when the host throttles us)."""
+    with _host_uas_lock:
+        current = _host_uas.get(host)
+        _host_uas[host] = random.choice([ua for ua in _UAS if ua != current] or _UAS)
+        return _host_uas[host]
+
+def get_random_headers(no_cache: bool = True, host: str = None) -> dict:
+    """
+    Browser-like headers; no_cache=False omits the no-cache directives so revalidation works.
+    With `host`, the user agent is that host's current sticky one instead of a random pick.
+    """
+    headers = {
+        "User-Agent": user_agent_for(host) if host else random.choice(_UAS),
         "Accept-Language": "en-US,en;q=0.9",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-    }
\ No newline at end of file
+    }
+    if no_cache:
+        headers["Cache-Control"] = "no-cache"
+        headers["Pragma"] = "no-cache"
+    return headers
\ No newline at end of file